@@ -0,0 +1,76 @@
+import os
+import shutil
+
+from concurrent.futures import ThreadPoolExecutor
+
+from discovery import ASSET_IGNORE, scan
+from manifest import hash_file, remove_output
+
+
+def list_assets(source_dir, ignore=ASSET_IGNORE, workers: int = 1) -> dict:
+    # relative path -> FileEntry
+    return {entry.relpath: entry for entry in scan(source_dir, ignore, workers=workers)}
+
+
+def is_unchanged(source, dest_path, source_path=None) -> bool:
+    try:
+        dest_stat = os.stat(dest_path)
+    except FileNotFoundError:
+        return False
+
+    if source.size != dest_stat.st_size:
+        return False
+
+    if source.mtime_ns == dest_stat.st_mtime_ns:
+        return True
+
+    # same size but touched: only compare contents when asked to
+    if source_path is not None and hash_file(source_path) == hash_file(dest_path):
+        os.utime(dest_path, ns=(dest_stat.st_atime_ns, source.mtime_ns))
+        return True
+
+    return False
+
+
+def copy_asset(source_path, dest_path, link: bool = False):
+    dest_dir = os.path.dirname(dest_path)
+    if not os.path.exists(dest_dir):
+        os.makedirs(dest_dir, exist_ok=True)
+
+    if os.path.lexists(dest_path):
+        os.remove(dest_path)
+
+    if link:
+        try:
+            os.link(source_path, dest_path)
+            return
+        except OSError:
+            # different filesystem or no hardlink support
+            pass
+
+    shutil.copy2(source_path, dest_path)
+
+
+def sync_assets(source_dir, dest_dir, previous=(), link=False, checksum=False, workers=1, ignore=ASSET_IGNORE):
+    # returns (assets, copied, removed); assets are the relative paths now synced
+    assets = list_assets(source_dir, ignore, workers)
+
+    changed = []
+    for relpath, entry in assets.items():
+        source_path = entry.path
+        dest_path = os.path.join(dest_dir, relpath)
+        if not is_unchanged(entry, dest_path, source_path if checksum else None):
+            changed.append((source_path, dest_path))
+
+    if workers > 1 and len(changed) > 1:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(lambda paths: copy_asset(*paths, link), changed))
+    else:
+        for source_path, dest_path in changed:
+            copy_asset(source_path, dest_path, link)
+
+    removed = sorted(set(previous) - set(assets))
+    for relpath in removed:
+        remove_output(os.path.join(dest_dir, relpath), dest_dir)
+
+    return sorted(assets), [dest_path for _, dest_path in changed], removed
@@ -0,0 +1,299 @@
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+import tracemalloc
+
+from assets import sync_assets
+from main import discover_pages
+from template import Template
+from textnode import (
+    BlockType,
+    Document,
+    markdown_to_blocks,
+    block_to_block_type,
+    text_to_textnodes,
+    markdown_to_html_node,
+    blocks_to_html_node,
+    extract_title,
+    INLINE_MEMO,
+)
+
+WORDS = (
+    "hobbit ring shire elf dwarf wizard mountain river forest king road tale "
+    "song shadow light council journey fellowship tower gate stone sword"
+).split()
+
+TEMPLATE = """<!DOCTYPE html>
+<html>
+<head><title>{{ Title }}</title><link href="/index.css" rel="stylesheet"></head>
+<body><article>{{ Content }}</article></body>
+</html>"""
+
+STAGES = ["discovery", "block_split", "inline_parse", "tree_build", "serialize", "template", "write", "asset_copy"]
+
+
+def sentence(rng: random.Random, words: int, link_density: float) -> str:
+    parts = []
+    for _ in range(words):
+        word = rng.choice(WORDS)
+        roll = rng.random()
+        if roll < link_density:
+            parts.append(f"[{word}](/{rng.choice(WORDS)}/{rng.choice(WORDS)})")
+        elif roll < link_density + 0.05:
+            parts.append(f"**{word}**")
+        elif roll < link_density + 0.1:
+            parts.append(f"*{word}*")
+        elif roll < link_density + 0.12:
+            parts.append(f"`{word}`")
+        else:
+            parts.append(word)
+
+    return " ".join(parts)
+
+
+def generate_markdown(rng: random.Random, blocks: int, link_density: float, code_share: float) -> str:
+    lines = [f"# {sentence(rng, 4, 0)}", ""]
+    for _ in range(blocks):
+        roll = rng.random()
+        if roll < code_share:
+            lines.append("```python")
+            lines.extend(f"    {rng.choice(WORDS)} = {rng.randint(0, 99)}" for _ in range(rng.randint(3, 12)))
+            lines.append("```")
+        elif roll < code_share + 0.15:
+            lines.extend(f"* {sentence(rng, rng.randint(3, 10), link_density)}" for _ in range(rng.randint(3, 8)))
+        elif roll < code_share + 0.2:
+            lines.extend(f"{i}. {sentence(rng, 6, link_density)}" for i in range(1, rng.randint(3, 8)))
+        elif roll < code_share + 0.25:
+            lines.append(f"## {sentence(rng, 3, 0)}")
+        elif roll < code_share + 0.3:
+            lines.append(f"> {sentence(rng, 12, link_density)}")
+        else:
+            lines.extend(sentence(rng, rng.randint(8, 20), link_density) for _ in range(rng.randint(1, 5)))
+        lines.append("")
+
+    return "\n".join(lines)
+
+
+def generate_site(root, pages=100, blocks=40, link_density=0.1, code_share=0.1, assets=20, seed=0):
+    rng = random.Random(seed)
+    content = os.path.join(root, "content")
+    for i in range(pages):
+        directory = os.path.join(content, f"section{i % 10}", f"page{i}")
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, "index.md"), "w") as f:
+            f.write(generate_markdown(rng, blocks, link_density, code_share))
+
+    static = os.path.join(root, "static", "images")
+    os.makedirs(static, exist_ok=True)
+    for i in range(assets):
+        with open(os.path.join(static, f"image{i}.png"), "wb") as f:
+            f.write(rng.randbytes(rng.randint(1024, 64 * 1024)))
+
+    with open(os.path.join(root, "template.html"), "w") as f:
+        f.write(TEMPLATE)
+
+
+def inline_spans(blocks: list[str]) -> list[str]:
+    spans = []
+    for block in blocks:
+        match block_to_block_type(block):
+            case BlockType.PARAGRAPH:
+                spans.append(block)
+            case BlockType.HEADING:
+                spans.append(block.split(" ", 1)[1])
+            case BlockType.UNORDERED_LIST | BlockType.ORDERED_LIST:
+                spans.extend(line.split(" ", 1)[1].strip() for line in block.split("\n"))
+
+    return spans
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def run_stages(root) -> dict:
+    content = os.path.join(root, "content")
+    dest = os.path.join(root, "docs")
+    timings = {}
+
+    timings["discovery"], pages = timed(lambda: discover_pages(content, dest))
+
+    documents = []
+    for page in pages:
+        with open(page.source, "r") as f:
+            documents.append(f.read())
+
+    timings["block_split"], blocks = timed(lambda: [markdown_to_blocks(doc) for doc in documents])
+    spans = [inline_spans(doc_blocks) for doc_blocks in blocks]
+    timings["inline_parse"], _ = timed(lambda: [[text_to_textnodes(span) for span in doc] for doc in spans])
+    typed = [[(block, block_to_block_type(block)) for block in doc_blocks] for doc_blocks in blocks]
+    # every run starts cold, a memo warmed by the previous run would flatter the stage
+    INLINE_MEMO.clear()
+    # starts from the split blocks, but the block converters parse their own
+    # spans, so this stage includes what inline_parse measured
+    timings["tree_build"], trees = timed(
+        lambda: [blocks_to_html_node(doc, "/", Document(keep_blocks=False)) for doc in typed]
+    )
+    timings["serialize"], bodies = timed(lambda: [tree.to_html() for tree in trees])
+
+    titles = [extract_title(doc) for doc in documents]
+    template = Template(TEMPLATE, "/site/")
+    timings["template"], rendered = timed(
+        lambda: [template.render({"Title": title, "Content": body}) for title, body in zip(titles, bodies)]
+    )
+
+    def write_pages():
+        for page, html in zip(pages, rendered):
+            os.makedirs(os.path.dirname(page.dest), exist_ok=True)
+            with open(page.dest, "w") as f:
+                f.write(html)
+
+    timings["write"], _ = timed(write_pages)
+    timings["asset_copy"], _ = timed(lambda: sync_assets(os.path.join(root, "static"), dest))
+
+    return timings
+
+
+def benchmark(config: dict, repeat: int = 3) -> dict:
+    # best of `repeat` runs per stage, each run into a fresh build directory
+    best = {}
+    with tempfile.TemporaryDirectory() as root:
+        generate_site(root, **config)
+        for i in range(repeat):
+            timings = run_stages(root)
+            for stage, seconds in timings.items():
+                best[stage] = min(best.get(stage, seconds), seconds)
+            os.rename(os.path.join(root, "docs"), os.path.join(root, f"docs-{i}"))
+
+    return {"config": config, "repeat": repeat, "stages": best}
+
+
+def count_nodes(node) -> int:
+    stack = [node]
+    count = 0
+    while stack:
+        node = stack.pop()
+        count += 1
+        stack.extend(node.children or ())
+
+    return count
+
+
+def memory_benchmark(blocks: int = 5000, link_density: float = 0.2, seed: int = 0) -> dict:
+    # memory held by the parsed tree of one large document, including its strings
+    markdown = generate_markdown(random.Random(seed), blocks, link_density, 0.1)
+
+    # memo entries would otherwise be counted as tree memory
+    memo_size = INLINE_MEMO.max_size
+    INLINE_MEMO.clear()
+    INLINE_MEMO.resize(0)
+    tracemalloc.start()
+    try:
+        tree = markdown_to_html_node(markdown)
+        tree_bytes, _ = tracemalloc.get_traced_memory()
+        textnodes = [text_to_textnodes(span) for span in inline_spans(markdown_to_blocks(markdown))]
+        textnode_bytes = tracemalloc.get_traced_memory()[0] - tree_bytes
+    finally:
+        tracemalloc.stop()
+        INLINE_MEMO.resize(memo_size)
+
+    html_nodes = count_nodes(tree)
+    text_nodes = sum(map(len, textnodes))
+    return {
+        "html_nodes": html_nodes,
+        "html_bytes_per_node": tree_bytes / html_nodes,
+        "text_nodes": text_nodes,
+        "text_bytes_per_node": textnode_bytes / text_nodes,
+    }
+
+
+def classification_benchmark(blocks: int = 5000, repeat: int = 5, seed: int = 0) -> dict:
+    # best nanoseconds per block_to_block_type call, per block type
+    markdown = generate_markdown(random.Random(seed), blocks, 0.1, 0.1)
+    by_type = {}
+    for block in markdown_to_blocks(markdown):
+        by_type.setdefault(block_to_block_type(block).value, []).append(block)
+
+    costs = {}
+    for name, samples in sorted(by_type.items()):
+        best = min(timed(lambda: [block_to_block_type(block) for block in samples])[0] for _ in range(repeat))
+        costs[name] = best / len(samples) * 1e9
+
+    return costs
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    regressions = []
+    for stage, seconds in results["stages"].items():
+        previous = baseline["stages"].get(stage)
+        if previous and seconds > previous * (1 + threshold):
+            regressions.append(f"{stage}: {previous * 1000:.1f}ms -> {seconds * 1000:.1f}ms")
+
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the build stages on a synthetic site.")
+    parser.add_argument("--pages", type=int, default=100)
+    parser.add_argument("--blocks", type=int, default=40, help="blocks per page")
+    parser.add_argument("--link-density", type=float, default=0.1, help="share of words that are links")
+    parser.add_argument("--code-share", type=float, default=0.1, help="share of blocks that are code")
+    parser.add_argument("--assets", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--memory", action="store_true", help="also measure parsed tree memory per node")
+    parser.add_argument("--classify", action="store_true", help="also measure block classification cost per block")
+    parser.add_argument("--output", help="write the results as json to this file")
+    parser.add_argument("--baseline", help="compare against results saved with --output")
+    parser.add_argument("--threshold", type=float, default=0.1, help="allowed slowdown per stage, 0.1 is 10%%")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    config = {
+        "pages": args.pages,
+        "blocks": args.blocks,
+        "link_density": args.link_density,
+        "code_share": args.code_share,
+        "assets": args.assets,
+        "seed": args.seed,
+    }
+    results = benchmark(config, args.repeat)
+
+    for stage in STAGES:
+        print(f"{stage:>14}: {results['stages'][stage] * 1000:9.2f}ms")
+
+    if args.memory:
+        results["memory"] = memory_benchmark(seed=args.seed)
+        for name, value in results["memory"].items():
+            print(f"{name:>20}: {value:9.1f}")
+
+    if args.classify:
+        results["classify"] = classification_benchmark(seed=args.seed)
+        for name, value in results["classify"].items():
+            print(f"{name:>20}: {value:9.1f}ns/block")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=1)
+
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        for regression in regressions:
+            print(f"Regression {regression}")
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
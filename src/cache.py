@@ -0,0 +1,85 @@
+import os
+import json
+import hashlib
+
+from textnode import PARSER_VERSION
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+# bodies are rendered with this as the basepath and stored split on it, so the
+# real basepath lands exactly where links and images need it
+BASEPATH_SLOT = "\0"
+CACHE_FORMAT = "2"
+
+
+class PageCache:
+    # rendered page bodies, split on BASEPATH_SLOT, and their Document metadata
+    # keyed by markdown hash, one json file per entry; entry mtimes double as
+    # the LRU clock
+    def __init__(self, directory, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, markdown: str, minify: bool = False) -> str:
+        variant = f"{CACHE_FORMAT}-{PARSER_VERSION}-min" if minify else f"{CACHE_FORMAT}-{PARSER_VERSION}"
+        return hashlib.sha256(f"{variant}\0{markdown}".encode()).hexdigest()
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def get(self, markdown: str, minify: bool = False):
+        path = self._entry_path(self.key(markdown, minify))
+        try:
+            with open(path, "r") as f:
+                entry = json.load(f)
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+
+        return entry["parts"], entry["metadata"]
+
+    def put(self, markdown: str, parts: list, metadata: dict, minify: bool = False):
+        path = self._entry_path(self.key(markdown, minify))
+        directory = os.path.dirname(path)
+        if not os.path.exists(directory):
+            os.makedirs(directory, exist_ok=True)
+
+        # workers may race on the same entry, so publish it with a rename
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"parts": parts, "metadata": metadata}, f)
+        os.replace(tmp_path, path)
+
+    def count(self, hit: bool):
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+
+    def evict(self) -> int:
+        if not os.path.exists(self.directory):
+            return 0
+
+        entries = []
+        total = 0
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                path = os.path.join(root, name)
+                stat = os.stat(path)
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+
+        removed = 0
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            os.remove(path)
+            total -= size
+            removed += 1
+
+        return removed
+
+    def summary(self) -> str:
+        return f"Page cache: {self.hits} hits, {self.misses} misses"
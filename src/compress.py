@@ -0,0 +1,84 @@
+import os
+import gzip
+
+from concurrent.futures import ThreadPoolExecutor
+
+from writer import write_output
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_SUFFIXES = (".html", ".css", ".js", ".json", ".svg", ".txt", ".xml")
+COMPRESSED_SUFFIXES = (".gz", ".br")
+
+
+def compressors(use_brotli: bool = True) -> dict:
+    # suffix -> compress(data); .br is only produced when brotli is installed
+    formats = {".gz": lambda data: gzip.compress(data, 9, mtime=0)}
+    if use_brotli and brotli is not None:
+        formats[".br"] = brotli.compress
+
+    return formats
+
+
+def is_compressed_fresh(path, compressed_path) -> bool:
+    # siblings carry their source's mtime, so a match means the source is unchanged
+    try:
+        return os.stat(compressed_path).st_mtime_ns == os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return False
+
+
+def is_orphaned_sibling(path) -> bool:
+    # a .gz/.br this module would have written for a text file that is gone;
+    # archives such as data.tar.gz are assets in their own right
+    source = path[:-3]
+    return path.endswith(COMPRESSED_SUFFIXES) and source.endswith(COMPRESSIBLE_SUFFIXES) and not os.path.exists(source)
+
+
+def compress_file(path, formats: dict) -> list[str]:
+    stale = [suffix for suffix in formats if not is_compressed_fresh(path, path + suffix)]
+    if not stale:
+        return []
+
+    with open(path, "rb") as f:
+        data = f.read()
+        stat = os.fstat(f.fileno())
+
+    written = []
+    for suffix in stale:
+        compressed_path = path + suffix
+        write_output(compressed_path, formats[suffix](data))
+        os.utime(compressed_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        written.append(compressed_path)
+
+    return written
+
+
+def precompress(root, workers: int = 1, use_brotli: bool = True) -> tuple[list, list]:
+    # writes .gz (and .br) siblings next to every changed text file below root and
+    # removes siblings whose source is gone; returns (written, removed)
+    formats = compressors(use_brotli)
+    sources = []
+    removed = []
+    for directory, _, names in os.walk(root):
+        for name in names:
+            path = os.path.join(directory, name)
+            if name.startswith("."):
+                continue
+            if name.endswith(COMPRESSIBLE_SUFFIXES):
+                sources.append(path)
+            elif is_orphaned_sibling(path):
+                os.remove(path)
+                removed.append(path)
+
+    # zlib and brotli release the GIL while compressing, so threads use every core
+    if workers > 1 and len(sources) > 1:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(lambda path: compress_file(path, formats), sources))
+    else:
+        results = [compress_file(path, formats) for path in sources]
+
+    return [path for written in results for path in written], removed
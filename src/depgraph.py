@@ -0,0 +1,54 @@
+class DependencyGraph:
+    # page -> the layout and partials it was rendered with, and the pages it
+    # links to; the hash of every included file is kept so the next build can
+    # tell which includes changed
+    def __init__(self, pages=None, files=None):
+        self.pages = pages if pages is not None else {}
+        self.files = files if files is not None else {}
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        return cls(data.get("pages", {}), data.get("files", {}))
+
+    def to_dict(self) -> dict:
+        return {"pages": self.pages, "files": self.files}
+
+    def add_page(self, page, includes, references=()):
+        self.pages[str(page)] = {"includes": list(includes), "references": sorted(set(references))}
+
+    def remove_page(self, page):
+        self.pages.pop(str(page), None)
+
+    def includes(self, page) -> list[str]:
+        entry = self.pages.get(str(page))
+        return entry["includes"] if entry is not None else []
+
+    def dependents(self, paths) -> set[str]:
+        # pages that include any of `paths`
+        paths = set(paths)
+        return {page for page, entry in self.pages.items() if paths.intersection(entry["includes"])}
+
+    def referrers(self, pages) -> set[str]:
+        # pages that link to any of `pages`
+        pages = set(map(str, pages))
+        return {page for page, entry in self.pages.items() if pages.intersection(entry["references"])}
+
+    def changed_files(self, hash_file) -> set[str]:
+        # included files that changed or vanished since their hash was stored
+        changed = set()
+        for path, digest in self.files.items():
+            try:
+                if hash_file(path) != digest:
+                    changed.add(path)
+            except FileNotFoundError:
+                changed.add(path)
+
+        return changed
+
+    def rebuild_set(self, hash_file) -> set[str]:
+        return self.dependents(self.changed_files(hash_file))
+
+    def update_files(self, hash_file):
+        # store the current hash of every file some page includes
+        included = {path for entry in self.pages.values() for path in entry["includes"]}
+        self.files = {path: hash_file(path) for path in sorted(included)}
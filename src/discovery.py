@@ -0,0 +1,86 @@
+import os
+import re
+import fnmatch
+
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+# dotfiles, _partials style folders and drafts are never published as pages
+PAGE_IGNORE = (".*", "_*", "drafts", "*.draft.md")
+# static/ may need dotfiles such as .well-known, only editor and OS clutter is skipped
+ASSET_IGNORE = (".DS_Store", "Thumbs.db", "*.swp", "*~")
+
+FileEntry = namedtuple("FileEntry", ["path", "relpath", "size", "mtime_ns"])
+
+
+def ignore_pattern(globs):
+    # one regex for every glob, matched against entry names
+    if not globs:
+        return None
+
+    return re.compile("|".join(fnmatch.translate(glob) for glob in globs))
+
+
+def scan(root, ignore=(), suffix=None, workers: int = 1) -> list[FileEntry]:
+    # every file below root in depth-first, name-sorted order; entry types come
+    # from the directory listing so only files that are kept get a stat call
+    root = str(root)
+    if not os.path.isdir(root):
+        return []
+
+    pattern = ignore_pattern(ignore)
+    top_files, top_dirs = _scan_directory(root, "", pattern, suffix)
+    if workers > 1 and len(top_dirs) > 1:
+        # wide trees are walked one top-level directory per thread
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            subtrees = dict(zip(top_dirs, executor.map(lambda d: _scan_tree(root, d, pattern, suffix), top_dirs)))
+    else:
+        subtrees = {d: _scan_tree(root, d, pattern, suffix) for d in top_dirs}
+
+    files = []
+    for name, entry in _merge_sorted(top_files, subtrees):
+        files.extend(entry if name in subtrees else [entry])
+
+    return files
+
+
+def _scan_directory(root, relpath, pattern, suffix) -> tuple[list, list]:
+    files = []
+    dirs = []
+    with os.scandir(os.path.join(root, relpath) if relpath else root) as entries:
+        for entry in entries:
+            if pattern is not None and pattern.match(entry.name):
+                continue
+
+            entry_relpath = os.path.join(relpath, entry.name) if relpath else entry.name
+            if entry.is_dir():
+                dirs.append(entry_relpath)
+            elif entry.is_file() and (suffix is None or entry.name.endswith(suffix)):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    # removed since the directory was listed
+                    continue
+                files.append(FileEntry(entry.path, entry_relpath, stat.st_size, stat.st_mtime_ns))
+
+    return sorted(files, key=lambda f: f.relpath), sorted(dirs)
+
+
+def _scan_tree(root, relpath, pattern, suffix) -> list[FileEntry]:
+    try:
+        files, dirs = _scan_directory(root, relpath, pattern, suffix)
+    except FileNotFoundError:
+        return []
+    subtrees = {d: _scan_tree(root, d, pattern, suffix) for d in dirs}
+
+    result = []
+    for name, entry in _merge_sorted(files, subtrees):
+        result.extend(entry if name in subtrees else [entry])
+
+    return result
+
+
+def _merge_sorted(files: list, subtrees: dict):
+    # files and directories of one level interleaved by name, like a sorted listdir
+    items = [(f.relpath, f) for f in files] + list(subtrees.items())
+    return sorted(items, key=lambda item: item[0])
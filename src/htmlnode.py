@@ -1,17 +1,63 @@
+import re
+import types
+
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
 class HTMLNode:
+    # slots and tuple-backed props keep the per-node footprint small
+    __slots__ = ("tag", "value", "children", "_props")
+
     def __init__(self, tag=None, value=None, children=None, props=None):
         self.tag = tag
         self.value = value
         self.children = children
         self.props = props
 
+    @property
+    def props(self):
+        if self._props is None:
+            return None
+        # read-only, so an edit through node.props raises instead of being lost;
+        # assign a new dict to change them
+        return types.MappingProxyType(dict(self._props))
+
+    @props.setter
+    def props(self, props):
+        self._props = None if props is None else tuple(props.items())
+
     def to_html(self) -> str:
         raise NotImplementedError
 
+    def iter_html(self, minify: bool = False):
+        # walks the tree with an explicit stack so deep documents never copy a
+        # subtree's markup once per ancestor; minify collapses whitespace in
+        # text outside of <pre>
+        stack = [self]
+        preformatted = 0
+        while stack:
+            item = stack.pop()
+            if isinstance(item, str):
+                if item == "</pre>":
+                    preformatted -= 1
+                yield item
+            elif not minify or preformatted:
+                yield item._expand_html(stack)
+            else:
+                if item.tag == "pre" and item.children is not None:
+                    preformatted += 1
+                yield item._expand_html(stack, True)
+
+    def write_html(self, fp, minify: bool = False):
+        fp.writelines(self.iter_html(minify))
+
+    def _expand_html(self, stack: list, minify: bool = False) -> str:
+        return self.to_html()
+
     def props_to_html(self) -> str:
-        if self.props is None:
+        if self._props is None:
             return ""
-        return " ".join([f'{key}="{val}"' for key, val in self.props.items()])
+        return " ".join([f'{key}="{val}"' for key, val in self._props])
 
     def __repr__(self):
         return f"HTMLNode({self.tag}, {self.value}, {self.children}, {str(self.props)})"
@@ -21,41 +67,61 @@ class HTMLNode:
             self.tag == other.tag
             and self.value == other.value
             and self.children == other.children
-            and str(self.props) == str(other.props)
+            and self._props == other._props
         )
 
 
 class LeafNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, value, props=None):
         super().__init__(tag, value, None, props)
 
-    def to_html(self) -> str:
+    def to_html(self, minify: bool = False) -> str:
         if self.value is None:
             raise ValueError()
 
+        value = WHITESPACE_PATTERN.sub(" ", self.value) if minify and self.tag != "pre" else self.value
         if self.tag is None:
-            return self.value
+            return value
 
         html_props = self.props_to_html()
         if html_props:
-            return f"<{self.tag} {html_props}>{self.value}</{self.tag}>"
+            return f"<{self.tag} {html_props}>{value}</{self.tag}>"
 
-        return f"<{self.tag}>{self.value}</{self.tag}>"
+        return f"<{self.tag}>{value}</{self.tag}>"
+
+    def _expand_html(self, stack: list, minify: bool = False) -> str:
+        return self.to_html(minify)
+
+    def copy(self):
+        # props are an immutable tuple, so the copy can share them
+        node = LeafNode(self.tag, self.value)
+        node._props = self._props
+        return node
 
 
 class ParentNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, children, props=None):
         super().__init__(tag, None, children, props)
 
-    def to_html(self) -> str:
+    def to_html(self, minify: bool = False) -> str:
+        return "".join(self.iter_html(minify))
+
+    def _expand_html(self, stack: list, minify: bool = False) -> str:
         if self.tag is None:
             raise ValueError()
 
         if self.children is None:
             raise ValueError("ParentNode must have at least one child")
 
-        content = "<{0}>{1}</{0}>".format(
-            self.tag, "".join(list(map(lambda x: x.to_html(), self.children)))
-        )
+        stack.append(f"</{self.tag}>")
+        stack.extend(reversed(self.children))
+
+        html_props = self.props_to_html()
+        if html_props:
+            return f"<{self.tag} {html_props}>"
 
-        return content
+        return f"<{self.tag}>"
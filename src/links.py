@@ -0,0 +1,72 @@
+import posixpath
+
+from urllib.parse import unquote, urlsplit
+
+
+def is_internal(url: str) -> bool:
+    if not url or url.startswith(("#", "//")):
+        return False
+
+    return urlsplit(url).scheme == ""
+
+
+def resolve(page: str, url: str) -> str:
+    # the site path `url` points at when linked from the output `page`
+    path = unquote(urlsplit(url).path)
+    if not path.startswith("/"):
+        path = posixpath.join(posixpath.dirname(page), path)
+
+    resolved = posixpath.normpath(path)
+    return resolved + "/" if path.endswith("/") and resolved != "/" else resolved
+
+
+def candidates(path: str) -> list[str]:
+    if path.endswith("/"):
+        return [f"{path}index.html"]
+
+    return [path, f"{path}/index.html", f"{path}.html"]
+
+
+def output_path(relpath: str) -> str:
+    return "/" + relpath.replace("\\", "/").lstrip("/")
+
+
+def link_targets(page: str, urls, outputs: dict) -> list:
+    # the values of `outputs` (keyed by site path) that internal `urls` on `page` point at
+    targets = []
+    for url in urls:
+        if not is_internal(url):
+            continue
+
+        for candidate in candidates(resolve(page, url)):
+            if candidate in outputs:
+                targets.append(outputs[candidate])
+                break
+
+    return targets
+
+
+class LinkIndex:
+    # source page -> link and image targets, collected from the parsed
+    # documents so checking never re-reads the generated HTML
+    def __init__(self):
+        self.pages = {}
+
+    def add(self, page: str, links=(), images=()):
+        self.pages[page] = (list(links), list(images))
+
+    def broken(self, assets=()) -> list[tuple[str, str]]:
+        outputs = set(self.pages)
+        outputs.update(output_path(asset) for asset in assets)
+
+        broken = []
+        for page, (links, images) in sorted(self.pages.items()):
+            for url in links + images:
+                if not is_internal(url):
+                    continue
+
+                path = resolve(page, url)
+                if not any(candidate in outputs for candidate in candidates(path)):
+                    broken.append((page, url))
+
+        return broken
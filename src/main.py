@@ -1,72 +1,643 @@
+import io
 import os
-import sys
-import shutil
+import tempfile
+import functools
+import logging
+import itertools
 import pathlib
+import argparse
 
-from textnode import markdown_to_html_node, extract_title
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from textnode import (
+    Document,
+    markdown_to_document,
+    blocks_to_html_node,
+    iter_html_fragments,
+    iter_typed_blocks,
+    iter_file_lines,
+    iter_lines,
+    read_title,
+    outline_to_html_node,
+    INLINE_MEMO,
+    DEFAULT_INLINE_MEMO_SIZE,
+)
+from assets import sync_assets
+from cache import BASEPATH_SLOT, PageCache
+from compress import COMPRESSED_SUFFIXES, precompress
+from discovery import ASSET_IGNORE, PAGE_IGNORE, scan
+from links import LinkIndex, link_targets, output_path
+from manifest import Manifest, hash_file, remove_output
+from profiler import NULL_PROFILE, BuildProfiler, PageProfile, format_report
+from search import SEARCH_DIR, SearchIndex, search_entry
+from shard import SHARD_MANIFEST_NAME, merge_shards, parse_shard, select_pages
+from template import Template, TemplateSet
+from watch import SiteWatcher, serve
+from writer import OutputWriter, write_output
 
-BASE_PATH = sys.argv[1] if len(sys.argv) > 1 else "/"
 BUILD_PATH = "docs/"
 STATIC_PATH = "static/"
 CONTENT_PATH = "content/"
+TEMPLATE_PATH = "template.html"
+MANIFEST_PATH = ".cache/manifest.json"
+PAGE_CACHE_PATH = ".cache/pages"
+REPORT_PATH = ".cache/build-report.json"
+# markdown files larger than this are streamed block by block instead of read whole
+STREAM_THRESHOLD = 8 * 1024 * 1024
+SPOOL_CHUNK_SIZE = 64 * 1024
+
+log = logging.getLogger("ssg")
+
+# a markdown source found by discover_pages, with the size and mtime of its scan
+Page = namedtuple("Page", ["source", "dest", "size", "mtime_ns"])
+
+# what generate_page hands back: the page's Document metadata, whether its body
+# came from the page cache (None when no cache is used), and the inline memo
+# (hits, misses) it caused, filled in by _generate_page_job
+PageResult = namedtuple("PageResult", ["metadata", "cache_hit", "inline_memo"], defaults=[(0, 0)])
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Build the static site from content/ into docs/.")
+    parser.add_argument("basepath", nargs="?", default="/")
+    parser.add_argument("--output", default=BUILD_PATH, help="directory the site is built into")
+    parser.add_argument(
+        "--shard",
+        type=parse_shard,
+        help="only build shard K of N (written as K/N) of the pages; shard 1 also copies the static assets",
+    )
+    parser.add_argument(
+        "--merge",
+        nargs="+",
+        metavar="SHARD_DIR",
+        help="combine the outputs of --shard builds into --output instead of building",
+    )
+    parser.add_argument(
+        "--ignore",
+        action="append",
+        default=[],
+        metavar="GLOB",
+        help="also skip content and static files or directories whose name matches GLOB; can be repeated",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="only re-render pages whose markdown, template or basepath changed",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="render pages across N worker processes",
+    )
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help=f"reuse rendered page bodies stored in {PAGE_CACHE_PATH}",
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=256,
+        help="maximum size of the page cache in MB",
+    )
+    parser.add_argument(
+        "--inline-memo",
+        type=int,
+        default=DEFAULT_INLINE_MEMO_SIZE,
+        help="number of rendered inline spans kept for reuse across pages, 0 disables it",
+    )
+    parser.add_argument(
+        "--hardlink",
+        action="store_true",
+        help="hardlink static assets into the build instead of copying them when possible",
+    )
+    parser.add_argument(
+        "--checksum",
+        action="store_true",
+        help="compare asset contents when size matches but mtime differs",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="serve docs/ and rebuild changed pages and assets until interrupted",
+    )
+    parser.add_argument("--port", type=int, default=8888, help="port used by --watch")
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="time every build and page stage and write a json report to --report",
+    )
+    parser.add_argument("--report", default=REPORT_PATH, help="where --profile writes its json report")
+    parser.add_argument("--top", type=int, default=10, help="number of slowest pages --profile lists")
+    parser.add_argument(
+        "--check-links",
+        action="store_true",
+        help="report internal links and images that point at no generated page or static file",
+    )
+    parser.add_argument(
+        "--strict-links",
+        action="store_true",
+        help="like --check-links, but fail the build when a link is broken",
+    )
+    parser.add_argument(
+        "--search",
+        action="store_true",
+        help="write a client-side search index of every page to search/ in the output",
+    )
+    parser.add_argument(
+        "--minify",
+        action="store_true",
+        help="collapse redundant whitespace in the generated HTML and the templates",
+    )
+    parser.add_argument(
+        "--precompress",
+        action="store_true",
+        help="write .gz (and .br when brotli is installed) siblings for changed HTML and text assets",
+    )
+    parser.add_argument("--no-brotli", action="store_true", help="only write .gz siblings with --precompress")
+    verbosity = parser.add_mutually_exclusive_group()
+    verbosity.add_argument("-q", "--quiet", action="store_true", help="only log warnings and errors")
+    verbosity.add_argument("-v", "--verbose", action="store_true", help="also log skipped pages")
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=0.2,
+        help="seconds between change checks in --watch mode",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    logging.basicConfig(
+        format="%(message)s",
+        level=logging.WARNING if args.quiet else logging.DEBUG if args.verbose else logging.INFO,
+    )
+    profiler = BuildProfiler() if args.profile else None
+    build_stage = profiler.stage if profiler is not None else NULL_PROFILE.stage
+
+    if args.merge:
+        merge(args)
+        return
+
+    manifest_path = MANIFEST_PATH if args.shard is None else os.path.join(args.output, SHARD_MANIFEST_NAME)
+    if args.incremental:
+        manifest = Manifest.load(manifest_path)
+    else:
+        # a full build records into a fresh manifest, so a later incremental
+        # build never trusts outputs from before this one; shards need it for --merge.
+        # the output is synced in place and whatever the build did not produce is
+        # removed afterwards, so unchanged files are neither copied nor rewritten
+        manifest = Manifest(manifest_path)
+
+    INLINE_MEMO.resize(args.inline_memo)
+    cache = PageCache(PAGE_CACHE_PATH, args.cache_size * 1024 * 1024) if args.cache else None
+
+    assets = []
+    if args.shard is None or args.shard[0] == 1:
+        with build_stage("assets"):
+            assets, copied, removed = sync_assets(
+                STATIC_PATH,
+                args.output,
+                manifest.assets if manifest is not None else (),
+                link=args.hardlink,
+                checksum=args.checksum,
+                workers=args.jobs,
+                ignore=ASSET_IGNORE + tuple(args.ignore),
+            )
+        log.info(
+            "Synced static assets: %d copied, %d removed, %d unchanged",
+            len(copied),
+            len(removed),
+            len(assets) - len(copied),
+        )
+    if manifest is not None:
+        manifest.assets = assets
+
+    link_index = None
+    if args.check_links or args.strict_links:
+        if args.shard is None:
+            link_index = LinkIndex()
+        else:
+            log.warning("A shard only sees its own pages, links are checked by --merge")
+
+    # shards only record their pages' search data in the manifest, --merge writes the index
+    search_index = SearchIndex() if args.search else None
+
+    try:
+        generate_pages_recursive(
+            CONTENT_PATH,
+            TEMPLATE_PATH,
+            args.output,
+            args.basepath,
+            manifest,
+            args.jobs,
+            cache,
+            profiler,
+            link_index,
+            args.minify,
+            args.shard,
+            PAGE_IGNORE + tuple(args.ignore),
+            search_index,
+        )
+        if not args.incremental:
+            with build_stage("prune"):
+                keep = {os.path.relpath(entry["output"], args.output) for entry in manifest.pages.values()}
+                keep.update(manifest.assets)
+                keep.add(SHARD_MANIFEST_NAME)
+                removed = remove_stale_outputs(
+                    args.output,
+                    keep,
+                    (SEARCH_DIR,) if search_index is not None else (),
+                    args.precompress,
+                )
+            if removed:
+                log.info("Removed %d stale file(s) from %s", len(removed), args.output)
+        if link_index is not None:
+            with build_stage("links"):
+                check_links(link_index, assets, args.strict_links)
+        if search_index is not None and args.shard is None:
+            with build_stage("search"):
+                write_search_index(search_index, args.output, args.basepath)
+        if args.precompress:
+            with build_stage("compress"):
+                written, removed = precompress(args.output, args.jobs, not args.no_brotli)
+            log.info("Precompressed %d file(s), removed %d stale", len(written), len(removed))
+    finally:
+        if manifest is not None:
+            manifest.save()
+        if cache is not None:
+            cache.evict()
+            log.info(cache.summary())
+        if profiler is not None:
+            print(format_report(profiler.write_report(args.report, args.top)))
+
+    if args.watch:
+        watch(args)
+
+
+def remove_stale_outputs(dest_dir, keep: set, owned_dirs=(), keep_compressed: bool = False) -> list[str]:
+    # removes every file below dest_dir whose relative path is not in `keep`;
+    # `owned_dirs` are cleaned up by whoever writes them and compressed siblings
+    # of kept files are left to precompress when `keep_compressed` is set
+    owned_dirs = tuple(os.path.join(directory, "") for directory in owned_dirs)
+    removed = []
+    for entry in scan(dest_dir):
+        if entry.relpath in keep or entry.relpath.startswith(owned_dirs):
+            continue
+        if keep_compressed and entry.relpath.endswith(COMPRESSED_SUFFIXES) and entry.relpath[:-3] in keep:
+            continue
+        remove_output(entry.path, dest_dir)
+        removed.append(entry.path)
+
+    return removed
+
+
+def check_links(link_index: LinkIndex, assets, strict: bool = False):
+    broken = link_index.broken(assets)
+    for page, url in broken:
+        log.warning("Broken link in %s: %s", page, url)
+
+    if broken and strict:
+        raise Exception(f"Found {len(broken)} broken link(s)")
+
+
+def merge(args):
+    manifest, copied, removed = merge_shards(args.merge, args.output, MANIFEST_PATH, args.jobs)
+    manifest.save()
+    log.info(
+        "Merged %d shard(s) into %s: %d copied, %d removed",
+        len(args.merge),
+        args.output,
+        len(copied),
+        len(removed),
+    )
+
+    if args.check_links or args.strict_links:
+        link_index = LinkIndex()
+        for entry in manifest.pages.values():
+            link_index.add(
+                output_path(os.path.relpath(entry["output"], args.output)),
+                entry.get("links", ()),
+                entry.get("images", ()),
+            )
+        check_links(link_index, manifest.assets, args.strict_links)
+
+    if args.search:
+        search_index = SearchIndex()
+        basepath = args.basepath
+        for source, entry in manifest.pages.items():
+            if "search" not in entry:
+                raise Exception(f"{source} has no search data, build the shards with --search")
+            search_index.add(output_path(os.path.relpath(entry["output"], args.output)), entry["search"])
+            # the urls use the basepath the shards were built with
+            basepath = entry["basepath"]
+        write_search_index(search_index, args.output, basepath)
+
 
-def main():
-    if os.path.exists(BUILD_PATH):
-        shutil.rmtree(BUILD_PATH)
+def write_search_index(search_index: SearchIndex, dest_dir, basepath):
+    written, removed = search_index.write(dest_dir, basepath)
+    log.info(
+        "Search index: %d page(s), %d file(s) written, %d removed",
+        len(search_index.pages),
+        len(written),
+        len(removed),
+    )
 
-    setup(STATIC_PATH)
-    generate_pages_recursive(CONTENT_PATH, "template.html", BUILD_PATH, BASE_PATH)
 
+def watch(args):
+    server = serve(args.output, args.port)
+    log.info("Serving %s on http://localhost:%d, watching for changes", args.output, args.port)
 
-def generate_pages_recursive(dir_path_content, template_path, dest_dir_path, basepath):
-    for item in os.listdir(dir_path_content):
-        item_path = pathlib.Path(os.path.join(dir_path_content, item))
-        dest_path = pathlib.Path(os.path.join(dest_dir_path, item))
+    watcher = SiteWatcher(
+        CONTENT_PATH,
+        STATIC_PATH,
+        TEMPLATE_PATH,
+        args.output,
+        args.basepath,
+        generate_page,
+        args.ignore,
+        args.minify,
+    )
+    try:
+        watcher.run(args.interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
 
-        if item_path.is_dir():
-            generate_pages_recursive(item_path, template_path, dest_path, basepath)
-        elif item_path.is_file() and item_path.suffix == ".md":
-            generate_page(item_path, template_path, dest_path.with_suffix(".html"), basepath)
 
+def generate_pages_recursive(
+    dir_path_content,
+    template_path,
+    dest_dir_path,
+    basepath,
+    manifest=None,
+    jobs=1,
+    cache=None,
+    profiler=None,
+    link_index=None,
+    minify=False,
+    shard=None,
+    ignore=PAGE_IGNORE,
+    search_index=None,
+):
+    build_stage = profiler.stage if profiler is not None else NULL_PROFILE.stage
 
-def generate_page(from_path, template_path, dest_path, basepath):
-    print(f"Generating page from {from_path} to {dest_path} using {template_path}")
+    with build_stage("discovery"):
+        pages = discover_pages(dir_path_content, dest_dir_path, ignore, jobs)
 
-    with open(from_path, "r") as m:
-        markdown = m.read()
+    templates = TemplateSet(template_path, basepath, minify)
+    outputs = {output_path(os.path.relpath(page.dest, dest_dir_path)): str(page.source) for page in pages}
+    if shard is not None:
+        pages = select_pages(pages, dir_path_content, *shard)
+    sources = {str(page.dest): str(page.source) for page in pages}
 
-    with open(template_path, "r") as t:
-        page = t.read()
+    pending = []
+    if manifest is None:
+        pending = [(page, None) for page in pages]
+    else:
+        with build_stage("manifest"):
+            graph = manifest.graph
+            # pages whose layout or one of its partials changed since the last build
+            stale = graph.rebuild_set(hash_file)
+            for page in pages:
+                from_path, dest_path = page.source, page.dest
+                # pages whose size and mtime match the manifest are not hashed again
+                digest = manifest.known_hash(from_path, page.size, page.mtime_ns) or hash_file(from_path)
+                template = templates.for_page(os.path.relpath(from_path, dir_path_content))
 
-    title = extract_title(markdown)
-    nodes = markdown_to_html_node(markdown)
-    content = nodes.to_html()
+                if (
+                    str(from_path) in graph.pages
+                    and str(from_path) not in stale
+                    and manifest.is_fresh(from_path, digest, template_key(template), basepath, dest_path)
+                    and (search_index is None or "search" in manifest.pages[str(from_path)])
+                ):
+                    log.debug("Skipping unchanged page %s", from_path)
+                    entry = manifest.pages[str(from_path)]
+                    site_path = output_path(os.path.relpath(dest_path, dest_dir_path))
+                    if link_index is not None:
+                        link_index.add(site_path, entry.get("links", ()), entry.get("images", ()))
+                    if search_index is not None:
+                        search_index.add(site_path, entry["search"])
+                else:
+                    pending.append((page, digest))
 
-    template = page.replace("{{ Title }}", title, 1).replace( "{{ Content }}", content, 1).replace('href="/', f'href="{basepath}').replace('src="/', f'src="{basepath}')
+    errors = []
+    memo_hits = memo_misses = 0
+    with build_stage("pages"):
+        jobs_list = []
+        for page, _ in pending:
+            template = templates.for_page(os.path.relpath(page.source, dir_path_content))
+            jobs_list.append((page.source, template, page.dest, basepath, cache, profiler is not None))
+        with OutputWriter() as writer:
+            results = render_pages(jobs_list, jobs, writer)
+            for (page, digest), job, (error, result, profile) in zip(pending, jobs_list, results):
+                from_path, template, dest_path = job[:3]
+                log.info("Generating page from %s to %s using %s", from_path, dest_path, template.path)
+                if result is not None and result.cache_hit is not None:
+                    cache.count(result.cache_hit)
+                if result is not None:
+                    memo_hits += result.inline_memo[0]
+                    memo_misses += result.inline_memo[1]
+                if profile is not None:
+                    profiler.add_page(profile)
+                if error is not None:
+                    log.error("Error generating page from %s: %s", from_path, error)
+                    errors.append(from_path)
+                    if manifest is not None:
+                        manifest.graph.remove_page(from_path)
+                    continue
 
+                site_path = output_path(os.path.relpath(dest_path, dest_dir_path))
+                links, images = result.metadata["links"], result.metadata["images"]
+                if link_index is not None:
+                    link_index.add(site_path, links, images)
+                search = search_entry(result.metadata) if search_index is not None else None
+                if search is not None:
+                    search_index.add(site_path, search)
+                if manifest is not None:
+                    manifest.record(
+                        from_path,
+                        digest,
+                        template_key(template),
+                        basepath,
+                        dest_path,
+                        links,
+                        images,
+                        page.size,
+                        page.mtime_ns,
+                        search,
+                    )
+                    manifest.graph.add_page(from_path, template.dependencies, link_targets(site_path, links, outputs))
+
+        for dest_path, error in writer.errors:
+            log.error("Error writing page %s: %s", dest_path, error)
+            errors.append(dest_path)
+            if manifest is not None:
+                # forget the page so the next incremental build writes it again
+                source = sources[dest_path]
+                manifest.pages.pop(source, None)
+                manifest.graph.remove_page(source)
+        if writer.written or writer.unchanged:
+            log.info(writer.summary())
+        if memo_hits or memo_misses:
+            log.info(
+                "Inline memo: %d hits, %d misses (%.1f%% hit rate)",
+                memo_hits,
+                memo_misses,
+                memo_hits * 100 / (memo_hits + memo_misses),
+            )
+
+    if manifest is not None:
+        for output in manifest.prune([page.source for page in pages]):
+            log.info("Removing stale page %s", output)
+            remove_output(output, dest_dir_path)
+        manifest.graph.update_files(hash_file)
+
+    if errors:
+        raise Exception(f"Failed to generate {len(errors)} page(s)")
+
+
+def template_key(template: Template) -> str:
+    # what the manifest records as a page's template: its layout and whether it is minified
+    return f"{template.path} (minified)" if template.minify else template.path
+
+
+def render_pages(jobs: list, workers: int = 1, writer=None):
+    # one (error, PageResult, profile) triple per job in input order; error is None when the page rendered.
+    # the writer is only used when rendering in this process, workers write their own pages
+    if workers <= 1 or len(jobs) <= 1:
+        return map(functools.partial(_generate_page_job, writer=writer), jobs)
+
+    chunksize = max(1, len(jobs) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(_generate_page_job, jobs, chunksize=chunksize))
+
+
+def _generate_page_job(job, writer=None):
+    *args, profiled = job
+    profile = PageProfile(args[0]) if profiled else NULL_PROFILE
+    hits, misses = INLINE_MEMO.hits, INLINE_MEMO.misses
+    try:
+        result = generate_page(*args, profile, writer)
+    except Exception as e:
+        return f"{type(e).__name__}: {e}", None, profile if profiled else None
+
+    result = result._replace(inline_memo=(INLINE_MEMO.hits - hits, INLINE_MEMO.misses - misses))
+    return None, result, profile if profiled else None
+
+
+def discover_pages(dir_path_content, dest_dir_path, ignore=PAGE_IGNORE, workers=1) -> list[Page]:
+    pages = []
+    for entry in scan(dir_path_content, ignore, ".md", workers):
+        dest_path = pathlib.Path(os.path.join(dest_dir_path, entry.relpath)).with_suffix(".html")
+        pages.append(Page(pathlib.Path(entry.path), dest_path, entry.size, entry.mtime_ns))
+
+    return pages
+
+
+def generate_page(from_path, template: Template, dest_path, basepath, cache=None, profile=NULL_PROFILE, writer=None):
+    # with a writer the page is queued on its thread pool, otherwise it is written before returning
+    if cache is None and os.path.getsize(from_path) > STREAM_THRESHOLD:
+        document = stream_page(from_path, template, dest_path, basepath, profile)
+        return PageResult(document.metadata(), None)
+
+    with profile.stage("read"):
+        with open(from_path, "r") as m:
+            markdown = m.read()
+            profile.bytes_in = os.fstat(m.fileno()).st_size
+
+    cache_hit = None
+    if cache is None or BASEPATH_SLOT in markdown:
+        document = Document(keep_blocks=False)
+        with profile.stage("blocks"):
+            blocks = list(iter_typed_blocks(iter_lines(markdown)))
+        with profile.stage("convert"):
+            content = blocks_to_html_node(blocks, basepath, document)
+    else:
+        with profile.stage("cache"):
+            cached = cache.get(markdown, template.minify)
+            cache_hit = cached is not None
+            if cached is None:
+                # bodies are cached without a basepath so a basepath change only re-joins them
+                document = markdown_to_document(markdown, BASEPATH_SLOT)
+                cached = document.node.to_html(template.minify).split(BASEPATH_SLOT), document.metadata()
+                cache.put(markdown, *cached, template.minify)
+            parts, metadata = cached
+            document = Document.from_metadata(metadata)
+            content = basepath.join(parts)
+
+    if document.title is None:
+        raise Exception("No title found in markdown")
+
+    with profile.stage("render"):
+        values = {"Title": document.title, "Content": content}
+        if "TOC" in template.placeholders:
+            values["TOC"] = outline_to_html_node(document.outline) or ""
+        buffer = io.StringIO()
+        template.write(buffer, values)
+        data = buffer.getvalue().encode()
+        profile.bytes_out = len(data)
+
+    with profile.stage("write"):
+        if writer is None:
+            write_output(dest_path, data)
+        else:
+            writer.submit(dest_path, data)
+
+    return PageResult(document.metadata(), cache_hit)
+
+
+def stream_page(from_path, template: Template, dest_path, basepath, profile=NULL_PROFILE):
+    # parses, converts and writes one block at a time so memory stays bounded
+    # by the largest block rather than the file
     dest_dir = os.path.dirname(dest_path)
     if not os.path.exists(dest_dir):
         os.makedirs(dest_dir)
 
-    with open(dest_path, "w") as d:
-        d.write(template)
-
+    with profile.stage("stream"):
+        with open(from_path, "r") as m:
+            profile.bytes_in = os.fstat(m.fileno()).st_size
+            blocks = iter_typed_blocks(iter_file_lines(m))
+            title, head = read_title(blocks)
 
-def setup(path: str):
+            document = Document(keep_blocks=False)
+            content = iter_html_fragments(itertools.chain(head, blocks), basepath, document, template.minify)
+            values = {"Title": title, "Content": content}
+            with tempfile.TemporaryFile("w+") as spool:
+                placeholders = template.placeholders
+                if "TOC" in placeholders:
+                    values["TOC"] = iter_toc(document, template.minify)
+                    if "Content" in placeholders and placeholders.index("TOC") < placeholders.index("Content"):
+                        # the outline is only complete once the body has been converted,
+                        # so a TOC above the content needs the body spooled to disk first
+                        spool.writelines(content)
+                        spool.seek(0)
+                        values["Content"] = iter(functools.partial(spool.read, SPOOL_CHUNK_SIZE), "")
 
-    store_path = f"{BUILD_PATH}/" + path.split(STATIC_PATH, 1)[1]
-    if not os.path.exists(store_path):
-        os.mkdir(store_path)
+                tmp_path = f"{dest_path}.{os.getpid()}.tmp"
+                try:
+                    with open(tmp_path, "w") as d:
+                        template.write(d, values)
+                        profile.bytes_out = d.tell()
+                    os.replace(tmp_path, dest_path)
+                finally:
+                    if os.path.exists(tmp_path):
+                        os.remove(tmp_path)
 
-    for item in os.listdir(path):
-        item_path = os.path.join(path, item)
+    return document
 
-        if os.path.isfile(item_path):
-            shutil.copy(item_path, os.path.join(store_path, item))
-        else:
-            setup(item_path)
 
-    return
+def iter_toc(document: Document, minify: bool = False):
+    # evaluated when the template reaches the slot, by then the outline is known
+    node = outline_to_html_node(document.outline)
+    if node is not None:
+        yield from node.iter_html(minify)
 
 
-main()
+if __name__ == "__main__":
+    main()
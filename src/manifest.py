@@ -0,0 +1,140 @@
+import os
+import json
+import time
+import hashlib
+
+from depgraph import DependencyGraph
+
+MANIFEST_VERSION = 2
+HASH_CHUNK_SIZE = 1024 * 1024
+# sources modified this recently may still change within the same mtime tick,
+# so their size and mtime are not trusted to vouch for the hash
+RACY_MTIME_NS = 2 * 1000 * 1000 * 1000
+
+
+def hash_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_file(path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+class Manifest:
+    def __init__(self, path, pages=None, assets=None, graph=None):
+        self.path = path
+        self.pages = pages if pages is not None else {}
+        self.assets = assets if assets is not None else []
+        self.graph = graph if graph is not None else DependencyGraph()
+
+    @classmethod
+    def load(cls, path):
+        if not os.path.exists(path):
+            return cls(path)
+
+        with open(path, "r") as f:
+            data = json.load(f)
+
+        if data.get("version") != MANIFEST_VERSION:
+            return cls(path)
+
+        return cls(path, data.get("pages", {}), data.get("assets", []), DependencyGraph.from_dict(data.get("graph", {})))
+
+    def save(self):
+        directory = os.path.dirname(self.path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(
+                {
+                    "version": MANIFEST_VERSION,
+                    "pages": self.pages,
+                    "assets": self.assets,
+                    "graph": self.graph.to_dict(),
+                },
+                f,
+                indent=1,
+                sort_keys=True,
+            )
+        os.replace(tmp_path, self.path)
+
+    def is_fresh(self, source, digest: str, template: str, basepath: str, output) -> bool:
+        entry = self.pages.get(str(source))
+        if entry is None:
+            return False
+
+        return (
+            entry["hash"] == digest
+            and entry["template"] == str(template)
+            and entry["basepath"] == basepath
+            and entry["output"] == str(output)
+            and os.path.exists(output)
+        )
+
+    def known_hash(self, source, size: int, mtime_ns: int):
+        # the recorded hash when the source still has the size and mtime it was hashed with
+        entry = self.pages.get(str(source))
+        if entry is None or entry.get("size") != size or entry.get("mtime_ns") != mtime_ns:
+            return None
+
+        return entry["hash"]
+
+    def record(
+        self,
+        source,
+        digest: str,
+        template: str,
+        basepath: str,
+        output,
+        links=(),
+        images=(),
+        size=None,
+        mtime_ns=None,
+        search=None,
+    ):
+        if mtime_ns is not None and time.time_ns() - mtime_ns < RACY_MTIME_NS:
+            size = mtime_ns = None
+
+        self.pages[str(source)] = {
+            "hash": digest,
+            "size": size,
+            "mtime_ns": mtime_ns,
+            "template": str(template),
+            "basepath": basepath,
+            "output": str(output),
+            "links": list(links),
+            "images": list(images),
+        }
+        if search is not None:
+            # kept so unchanged pages can be put back in the search index without parsing them
+            self.pages[str(source)]["search"] = search
+
+    def prune(self, sources) -> list[str]:
+        # drops entries whose sources vanished and returns their outputs
+        current = set(map(str, sources))
+        removed = []
+        for source in list(self.pages):
+            if source not in current:
+                removed.append(self.pages.pop(source)["output"])
+                self.graph.remove_page(source)
+
+        return removed
+
+
+def remove_output(path, root):
+    if os.path.exists(path):
+        os.remove(path)
+
+    # clean up directories left empty, but never the build root itself
+    root = os.path.abspath(root)
+    directory = os.path.dirname(os.path.abspath(path))
+    while directory != root and directory.startswith(root) and os.path.isdir(directory) and not os.listdir(directory):
+        os.rmdir(directory)
+        directory = os.path.dirname(directory)
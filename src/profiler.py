@@ -0,0 +1,112 @@
+import os
+import json
+import time
+
+from contextlib import contextmanager, nullcontext
+
+
+class PageProfile:
+    def __init__(self, source):
+        self.source = str(source)
+        self.stages = {}
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - start
+
+    @property
+    def seconds(self) -> float:
+        return sum(self.stages.values())
+
+
+class NullProfile:
+    # stands in for PageProfile when profiling is off
+    bytes_in = 0
+    bytes_out = 0
+
+    def stage(self, name: str):
+        return nullcontext()
+
+
+NULL_PROFILE = NullProfile()
+
+
+class BuildProfiler:
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.stages = {}
+        self.pages = []
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - start
+
+    def add_page(self, profile: PageProfile):
+        self.pages.append(profile)
+
+    def page_stages(self) -> dict:
+        totals = {}
+        for page in self.pages:
+            for name, seconds in page.stages.items():
+                totals[name] = totals.get(name, 0.0) + seconds
+
+        return totals
+
+    def slowest(self, count: int) -> list[PageProfile]:
+        return sorted(self.pages, key=lambda page: page.seconds, reverse=True)[:count]
+
+    def report(self, top: int = 10) -> dict:
+        return {
+            "wall_seconds": time.perf_counter() - self.start,
+            "pages": len(self.pages),
+            "bytes_in": sum(page.bytes_in for page in self.pages),
+            "bytes_out": sum(page.bytes_out for page in self.pages),
+            "build_stages": self.stages,
+            "page_stages": self.page_stages(),
+            "slowest_pages": [
+                {
+                    "source": page.source,
+                    "seconds": page.seconds,
+                    "bytes_in": page.bytes_in,
+                    "bytes_out": page.bytes_out,
+                    "stages": page.stages,
+                }
+                for page in self.slowest(top)
+            ],
+        }
+
+    def write_report(self, path, top: int = 10) -> dict:
+        report = self.report(top)
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(report, f, indent=1)
+
+        return report
+
+
+def format_report(report: dict) -> str:
+    lines = [f"Built {report['pages']} page(s) in {report['wall_seconds']:.3f}s"]
+    for name, seconds in report["build_stages"].items():
+        lines.append(f"  {name:<12} {seconds * 1000:10.2f}ms")
+
+    lines.append("Page stages (summed over pages):")
+    for name, seconds in report["page_stages"].items():
+        lines.append(f"  {name:<12} {seconds * 1000:10.2f}ms")
+
+    lines.append("Slowest pages:")
+    for page in report["slowest_pages"]:
+        lines.append(f"  {page['seconds'] * 1000:10.2f}ms {page['bytes_in']:>10}B  {page['source']}")
+
+    return "\n".join(lines)
@@ -0,0 +1,81 @@
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, as_completed, wait
+
+from textnode import markdown_to_document, outline_to_html_node
+
+RenderResult = namedtuple("RenderResult", ["index", "value", "error"])
+
+_worker_options = {}
+
+
+def render(markdown: str, basepath=None, output: str = "html", template=None):
+    document = markdown_to_document(markdown, basepath)
+    node = document.node
+    if output == "node":
+        return node
+
+    if output != "html":
+        raise ValueError(f"Unknown output {output!r}, expected 'html' or 'node'")
+
+    if template is None:
+        return node.to_html()
+
+    toc = outline_to_html_node(document.outline)
+    return template.render({
+        "Title": document.title or "",
+        "Content": node.to_html(),
+        "TOC": toc.to_html() if toc is not None else "",
+    })
+
+
+def _init_worker(options: dict):
+    # workers keep the compiled template for every chunk they render
+    _worker_options.update(options)
+
+
+def _render_chunk(chunk: list, options=None) -> list[RenderResult]:
+    options = _worker_options if options is None else options
+    results = []
+    for index, markdown in chunk:
+        try:
+            results.append(RenderResult(index, render(markdown, **options), None))
+        except Exception as e:
+            results.append(RenderResult(index, None, e))
+
+    return results
+
+
+def _chunks(docs, size: int):
+    chunk = []
+    for index, markdown in enumerate(docs):
+        chunk.append((index, markdown))
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+
+    if chunk:
+        yield chunk
+
+
+def render_many(docs, workers: int = 1, basepath=None, output: str = "html", template=None, chunksize: int = 16):
+    # yields a RenderResult per document as soon as it is rendered; `index` is
+    # the document's position in `docs` and failures are reported in `error`
+    options = {"basepath": basepath, "output": output, "template": template}
+    if workers <= 1:
+        for chunk in _chunks(docs, chunksize):
+            yield from _render_chunk(chunk, options)
+        return
+
+    chunks = _chunks(docs, chunksize)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(options,)) as executor:
+        # keep a bounded number of chunks in flight so huge inputs are consumed lazily
+        pending = set()
+        for chunk in chunks:
+            pending.add(executor.submit(_render_chunk, chunk))
+            if len(pending) >= workers * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield from future.result()
+
+        for future in as_completed(pending):
+            yield from future.result()
@@ -0,0 +1,78 @@
+import os
+import re
+import json
+
+from writer import write_output
+
+SEARCH_DIR = "search"
+SEARCH_VERSION = 1
+# terms per shard file; the browser loads index.json, then only the shards its query terms fall in
+SHARD_SIZE = 1024
+SHARD_NAME_PATTERN = re.compile(r"terms-(\d+)\.json")
+
+
+def page_url(site_path: str, basepath: str = "/") -> str:
+    # "/blog/tom/index.html" -> "{basepath}blog/tom/"
+    if site_path.endswith("/index.html"):
+        site_path = site_path[: -len("index.html")]
+
+    return basepath.rstrip("/") + site_path
+
+
+def search_entry(metadata: dict) -> dict:
+    # the part of a page's Document metadata the index needs, as kept in the manifest
+    return {"title": metadata["title"], "snippet": metadata["snippet"], "terms": metadata["terms"]}
+
+
+def encode(data) -> bytes:
+    return json.dumps(data, separators=(",", ":")).encode()
+
+
+class SearchIndex:
+    # site path -> title, snippet and term counts, collected from the parsed
+    # documents so the index never re-reads the generated HTML
+    def __init__(self):
+        self.pages = {}
+
+    def add(self, page: str, entry: dict):
+        self.pages[page] = entry
+
+    def write(self, root, basepath: str = "/", shard_size: int = SHARD_SIZE) -> tuple[list, list]:
+        # writes {root}/search/index.json and its term shards, leaving files whose
+        # contents did not change untouched; returns (written, removed)
+        pages = sorted(self.pages)
+        postings = {}
+        for page_id, page in enumerate(pages):
+            for term, count in self.pages[page]["terms"].items():
+                postings.setdefault(term, []).append((-count, page_id))
+
+        terms = sorted(postings)
+        shards = [terms[start : start + shard_size] for start in range(0, len(terms), shard_size)]
+        directory = os.path.join(root, SEARCH_DIR)
+        files = {}
+        for number, shard in enumerate(shards):
+            # page ids of every term, most occurrences first
+            files[f"terms-{number}.json"] = {term: [page_id for _, page_id in sorted(postings[term])] for term in shard}
+        files["index.json"] = {
+            "version": SEARCH_VERSION,
+            "pages": [
+                [page_url(page, basepath), self.pages[page]["title"], self.pages[page]["snippet"]] for page in pages
+            ],
+            # first term of every shard, for a binary search on the client
+            "shards": [shard[0] for shard in shards],
+        }
+
+        written = []
+        for name, data in files.items():
+            path = os.path.join(directory, name)
+            if write_output(path, encode(data)):
+                written.append(path)
+
+        # shards left over from a larger index
+        removed = []
+        for name in os.listdir(directory):
+            if SHARD_NAME_PATTERN.fullmatch(name) and name not in files:
+                os.remove(os.path.join(directory, name))
+                removed.append(os.path.join(directory, name))
+
+        return written, removed
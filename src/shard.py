@@ -0,0 +1,94 @@
+import os
+import filecmp
+import hashlib
+import pathlib
+
+from concurrent.futures import ThreadPoolExecutor
+
+from assets import copy_asset
+from manifest import Manifest, remove_output
+
+# every shard build keeps its manifest inside its output so merging needs nothing else
+SHARD_MANIFEST_NAME = ".shard-manifest.json"
+
+
+def parse_shard(value: str) -> tuple[int, int]:
+    # "K/N" -> (K, N), shards are numbered from 1
+    try:
+        shard, count = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise ValueError(f"Invalid shard {value!r}, expected K/N")
+
+    if not 1 <= shard <= count:
+        raise ValueError(f"Invalid shard {value!r}, K must be between 1 and N")
+
+    return shard, count
+
+
+def shard_of(key: str, count: int) -> int:
+    # rendezvous hashing: every page goes to the shard with the highest score, so
+    # adding or removing pages never moves the others between shards
+    def score(shard):
+        return hashlib.sha256(f"{shard}\0{key}".encode()).digest()
+
+    return max(range(1, count + 1), key=score)
+
+
+def page_key(source, content_root) -> str:
+    # the same on every machine, whatever the checkout path or OS
+    return pathlib.Path(os.path.relpath(source, content_root)).as_posix()
+
+
+def select_pages(pages: list, content_root, shard: int, count: int) -> list:
+    return [page for page in pages if shard_of(page_key(page.source, content_root), count) == shard]
+
+
+def merge_shards(shard_dirs: list, dest_dir, manifest_path, workers: int = 1) -> tuple[Manifest, list, list]:
+    # copies every shard output into dest_dir, removes files no shard produced and
+    # combines the shard manifests into one; returns (manifest, copied, removed)
+    manifest = Manifest(manifest_path)
+    files = {}
+    for shard_dir in shard_dirs:
+        shard_manifest = Manifest.load(os.path.join(shard_dir, SHARD_MANIFEST_NAME))
+        for source, entry in shard_manifest.pages.items():
+            entry["output"] = os.path.join(dest_dir, os.path.relpath(entry["output"], shard_dir))
+            manifest.pages[source] = entry
+        manifest.graph.pages.update(shard_manifest.graph.pages)
+        manifest.graph.files.update(shard_manifest.graph.files)
+        manifest.assets.extend(shard_manifest.assets)
+
+        for directory, _, names in os.walk(shard_dir):
+            for name in names:
+                path = os.path.join(directory, name)
+                relpath = os.path.relpath(path, shard_dir)
+                if relpath == SHARD_MANIFEST_NAME:
+                    continue
+                if relpath in files:
+                    raise Exception(f"{relpath} was generated by more than one shard")
+                files[relpath] = path
+    manifest.assets = sorted(set(manifest.assets))
+
+    def merge_file(relpath):
+        dest_path = os.path.join(dest_dir, relpath)
+        # identical files are left alone so their mtime does not change
+        if os.path.isfile(dest_path) and filecmp.cmp(files[relpath], dest_path, shallow=False):
+            return None
+        copy_asset(files[relpath], dest_path)
+        return dest_path
+
+    if workers > 1 and len(files) > 1:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            copied = list(executor.map(merge_file, sorted(files)))
+    else:
+        copied = [merge_file(relpath) for relpath in sorted(files)]
+
+    removed = []
+    for directory, _, names in os.walk(dest_dir):
+        for name in names:
+            path = os.path.join(directory, name)
+            if os.path.relpath(path, dest_dir) not in files:
+                removed.append(path)
+    for path in removed:
+        remove_output(path, dest_dir)
+
+    return manifest, [path for path in copied if path is not None], removed
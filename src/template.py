@@ -0,0 +1,156 @@
+import os
+import re
+
+PLACEHOLDER_PATTERN = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+PARTIAL_PATTERN = re.compile(r"\{\{>\s*([\w./-]+)\s*\}\}")
+WHITESPACE_PATTERN = re.compile(r"\s+")
+# contents of these elements are never touched by minify_html
+PRESERVED_PATTERN = re.compile(r"(<(pre|textarea|script|style)\b[^>]*>)(.*?)(</\2\s*>)", re.S | re.I)
+PRESERVED_TOKEN_PATTERN = re.compile(r"\0(\d+)\0")
+BLOCK_TAGS = (
+    r"(?:html|head|body|title|meta|link|script|style|div|p|ul|ol|li|main|article|section|header|footer|nav|aside"
+    r"|h[1-6]|blockquote|pre|table|thead|tbody|tr|td|th|hr|br|form|figure|figcaption)"
+)
+# whitespace next to a block-level tag never renders
+SPACE_BEFORE_BLOCK_PATTERN = re.compile(rf"\s+(?=<(?:!|/?{BLOCK_TAGS}\b))", re.I)
+SPACE_AFTER_BLOCK_PATTERN = re.compile(rf"(<(?:!|/?{BLOCK_TAGS}\b)[^>]*>)\s+", re.I)
+LAYOUTS_DIR = "layouts"
+PARTIALS_DIR = "partials"
+
+
+def apply_basepath(html: str, basepath: str) -> str:
+    if basepath == "/":
+        return html
+
+    return html.replace('href="/', f'href="{basepath}').replace('src="/', f'src="{basepath}')
+
+
+def minify_html(source: str) -> str:
+    # preserved contents are swapped for tokens while the rest is collapsed
+    preserved = []
+
+    def keep(match):
+        preserved.append(match.group(3))
+        return f"{match.group(1)}\0{len(preserved) - 1}\0{match.group(4)}"
+
+    html = _collapse_whitespace(PRESERVED_PATTERN.sub(keep, source))
+    return PRESERVED_TOKEN_PATTERN.sub(lambda match: preserved[int(match.group(1))], html).strip()
+
+
+def _collapse_whitespace(html: str) -> str:
+    html = WHITESPACE_PATTERN.sub(" ", html)
+    html = SPACE_BEFORE_BLOCK_PATTERN.sub("", html)
+    return SPACE_AFTER_BLOCK_PATTERN.sub(r"\1", html)
+
+
+def expand_partials(source: str, partials_path, dependencies: list, parents=()) -> str:
+    # inlines every {{> name }} with partials/name.html, recursively, and
+    # appends each partial file it read to `dependencies`
+    def include(match):
+        path = os.path.join(partials_path, f"{match.group(1)}.html")
+        if path in parents:
+            raise Exception(f"Partial {path} includes itself")
+
+        with open(path, "r") as p:
+            partial = p.read()
+        if path not in dependencies:
+            dependencies.append(path)
+
+        return expand_partials(partial, partials_path, dependencies, parents + (path,))
+
+    return PARTIAL_PATTERN.sub(include, source)
+
+
+class Template:
+    def __init__(self, source: str, basepath: str = "/", partials_path=None, minify: bool = False):
+        self.basepath = basepath
+        self.minify = minify
+        self.literals = []
+        self.slots = []
+        # the files this template was compiled from, itself first when loaded from a file
+        self.dependencies = []
+
+        if partials_path is not None:
+            source = expand_partials(source, partials_path, self.dependencies)
+        if minify:
+            source = minify_html(source)
+
+        position = 0
+        for match in PLACEHOLDER_PATTERN.finditer(source):
+            self.literals.append(apply_basepath(source[position:match.start()], basepath))
+            self.slots.append((match.group(1), match.group(0)))
+            position = match.end()
+        self.literals.append(apply_basepath(source[position:], basepath))
+
+    @classmethod
+    def from_file(cls, path, basepath: str = "/", partials_path=None, minify: bool = False):
+        with open(path, "r") as t:
+            template = cls(t.read(), basepath, partials_path, minify)
+
+        template.dependencies.insert(0, str(path))
+        return template
+
+    @property
+    def path(self):
+        return self.dependencies[0] if self.dependencies else None
+
+    @property
+    def placeholders(self) -> list[str]:
+        return [name for name, _ in self.slots]
+
+    def render(self, values: dict) -> str:
+        # placeholders without a value are kept verbatim
+        parts = [self.literals[0]]
+        for (name, raw), literal in zip(self.slots, self.literals[1:]):
+            parts.append(values.get(name, raw))
+            parts.append(literal)
+
+        return "".join(parts)
+
+    def write(self, fp, values: dict):
+        # like render, but HTMLNode values and iterables of fragments are
+        # streamed straight into fp; fragments are expected to be minified
+        # already when the template is
+        fp.write(self.literals[0])
+        for (name, raw), literal in zip(self.slots, self.literals[1:]):
+            value = values.get(name, raw)
+            if isinstance(value, str):
+                fp.write(value)
+            elif hasattr(value, "write_html"):
+                value.write_html(fp, self.minify)
+            else:
+                fp.writelines(value)
+            fp.write(literal)
+
+
+class TemplateSet:
+    # content/<section>/... pages use layouts/<section>.html when it exists and
+    # the default template otherwise; layouts and partials sit next to the
+    # default template and each is compiled once
+    def __init__(self, default_path, basepath: str = "/", minify: bool = False):
+        self.default_path = str(default_path)
+        self.basepath = basepath
+        self.minify = minify
+        root = os.path.dirname(self.default_path)
+        self.layouts_path = os.path.join(root, LAYOUTS_DIR)
+        self.partials_path = os.path.join(root, PARTIALS_DIR)
+        self.layouts = {}
+        self.templates = {}
+
+    def layout_path(self, relpath) -> str:
+        parts = os.path.normpath(relpath).split(os.sep)
+        section = parts[0] if len(parts) > 1 else None
+        if section not in self.layouts:
+            layout = os.path.join(self.layouts_path, f"{section}.html")
+            self.layouts[section] = layout if section is not None and os.path.isfile(layout) else self.default_path
+
+        return self.layouts[section]
+
+    def for_page(self, relpath) -> Template:
+        path = self.layout_path(relpath)
+        template = self.templates.get(path)
+        if template is None:
+            template = Template.from_file(path, self.basepath, self.partials_path, self.minify)
+            self.templates[path] = template
+
+        return template
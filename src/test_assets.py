@@ -0,0 +1,59 @@
+import os
+import tempfile
+import unittest
+
+from assets import sync_assets
+from fixtures import write
+
+
+class TestSyncAssets(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.static = os.path.join(self.tmp.name, "static")
+        self.dest = os.path.join(self.tmp.name, "docs")
+        write(os.path.join(self.static, "index.css"), "body {}")
+        write(os.path.join(self.static, "images", "logo.png"), "png")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_copies_only_changed_assets(self):
+        assets, copied, removed = sync_assets(self.static, self.dest, workers=2)
+        self.assertEqual(assets, [os.path.join("images", "logo.png"), "index.css"])
+        self.assertEqual(len(copied), 2)
+        self.assertEqual(removed, [])
+
+        _, copied, _ = sync_assets(self.static, self.dest, assets)
+        self.assertEqual(copied, [])
+
+        write(os.path.join(self.static, "index.css"), "body { margin: 0 }")
+        _, copied, _ = sync_assets(self.static, self.dest, assets)
+        self.assertEqual(copied, [os.path.join(self.dest, "index.css")])
+
+    def test_checksum_skips_touched_files(self):
+        sync_assets(self.static, self.dest)
+        os.utime(os.path.join(self.static, "index.css"), (1, 1))
+
+        _, copied, _ = sync_assets(self.static, self.dest, checksum=True)
+        self.assertEqual(copied, [])
+        self.assertEqual(os.stat(os.path.join(self.dest, "index.css")).st_mtime, 1)
+
+    def test_removes_stale_assets(self):
+        assets, _, _ = sync_assets(self.static, self.dest)
+        os.remove(os.path.join(self.static, "images", "logo.png"))
+
+        assets, _, removed = sync_assets(self.static, self.dest, assets)
+        self.assertEqual(assets, ["index.css"])
+        self.assertEqual(removed, [os.path.join("images", "logo.png")])
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "images")))
+
+    def test_hardlink(self):
+        sync_assets(self.static, self.dest, link=True)
+
+        self.assertTrue(
+            os.path.samefile(os.path.join(self.static, "index.css"), os.path.join(self.dest, "index.css"))
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
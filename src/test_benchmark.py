@@ -0,0 +1,43 @@
+import os
+import random
+import tempfile
+import unittest
+
+from benchmark import STAGES, benchmark, classification_benchmark, compare, generate_markdown, generate_site
+from textnode import markdown_to_html_node
+
+
+class TestBenchmark(unittest.TestCase):
+    def test_generate_site_is_reproducible(self):
+        with tempfile.TemporaryDirectory() as first, tempfile.TemporaryDirectory() as second:
+            generate_site(first, pages=3, blocks=5, assets=1, seed=7)
+            generate_site(second, pages=3, blocks=5, assets=1, seed=7)
+
+            page = os.path.join("content", "section1", "page1", "index.md")
+            with open(os.path.join(first, page)) as a, open(os.path.join(second, page)) as b:
+                self.assertEqual(a.read(), b.read())
+
+    def test_generated_markdown_parses(self):
+        rng = random.Random(1)
+        for _ in range(20):
+            markdown_to_html_node(generate_markdown(rng, 30, 0.3, 0.2)).to_html()
+
+    def test_benchmark_and_compare(self):
+        results = benchmark({"pages": 2, "blocks": 5, "assets": 1}, repeat=1)
+        self.assertEqual(sorted(results["stages"]), sorted(STAGES))
+
+        baseline = {"stages": {stage: 1.0 for stage in STAGES}}
+        self.assertEqual(compare({"stages": {"serialize": 1.05}}, baseline, 0.1), [])
+        self.assertEqual(
+            compare({"stages": {"serialize": 1.2}}, baseline, 0.1),
+            ["serialize: 1000.0ms -> 1200.0ms"],
+        )
+
+    def test_classification_benchmark(self):
+        costs = classification_benchmark(blocks=50, repeat=1)
+        self.assertIn("paragraph", costs)
+        self.assertTrue(all(cost > 0 for cost in costs.values()))
+
+
+if __name__ == "__main__":
+    unittest.main()
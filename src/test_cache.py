@@ -0,0 +1,47 @@
+import os
+import tempfile
+import unittest
+
+from cache import PageCache
+
+
+class TestPageCache(unittest.TestCase):
+    def test_get_and_put(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = PageCache(tmp)
+            self.assertIsNone(cache.get("# Title"))
+
+            parts = ['<div><a href="', 'x">Title</a></div>']
+            cache.put("# Title", parts, {"title": "Title"})
+            self.assertEqual(cache.get("# Title"), (parts, {"title": "Title"}))
+            self.assertIsNone(cache.get("# Other"))
+            self.assertIsNone(cache.get("# Title", minify=True))
+
+    def test_count_and_summary(self):
+        cache = PageCache("unused")
+        cache.count(True)
+        cache.count(False)
+        cache.count(True)
+
+        self.assertEqual(cache.summary(), "Page cache: 2 hits, 1 misses")
+
+    def test_evict_least_recently_used(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = PageCache(tmp)
+            for i in range(3):
+                cache.put(f"# Page {i}", ["x" * 100], {"title": f"Page {i}"})
+                path = cache._entry_path(cache.key(f"# Page {i}"))
+                os.utime(path, (i, i))
+
+            # reading the oldest entry makes it the most recently used one
+            cache.get("# Page 0")
+            cache.max_bytes = os.path.getsize(path) * 2
+
+            self.assertEqual(cache.evict(), 1)
+            self.assertIsNone(cache.get("# Page 1"))
+            self.assertIsNotNone(cache.get("# Page 0"))
+            self.assertIsNotNone(cache.get("# Page 2"))
+
+
+if __name__ == "__main__":
+    unittest.main()
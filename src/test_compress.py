@@ -0,0 +1,39 @@
+import os
+import gzip
+import tempfile
+import unittest
+
+from compress import precompress
+from fixtures import write
+
+
+class TestCompress(unittest.TestCase):
+    def test_precompress_only_changed_files(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            page = os.path.join(tmp, "blog", "index.html")
+            write(page, "<p>page</p>" * 50)
+            write(os.path.join(tmp, "index.css"), "body { margin: 0 }")
+            write(os.path.join(tmp, "images", "logo.png"), "not text")
+            write(os.path.join(tmp, "gone.html.gz"), "stale")
+            archive = os.path.join(tmp, "dl", "data.tar.gz")
+            write(archive, "archive")
+
+            written, removed = precompress(tmp, workers=2, use_brotli=False)
+            self.assertEqual(sorted(written), [page + ".gz", os.path.join(tmp, "index.css.gz")])
+            self.assertEqual(removed, [os.path.join(tmp, "gone.html.gz")])
+            # static files that happen to be compressed are not siblings
+            self.assertTrue(os.path.exists(archive))
+            with gzip.open(page + ".gz", "rb") as f:
+                self.assertEqual(f.read(), b"<p>page</p>" * 50)
+
+            self.assertEqual(precompress(tmp, use_brotli=False), ([], []))
+
+            write(page, "<p>changed</p>")
+            os.utime(page, ns=(1, 1))
+            self.assertEqual(precompress(tmp, use_brotli=False), ([page + ".gz"], []))
+            with gzip.open(page + ".gz", "rb") as f:
+                self.assertEqual(f.read(), b"<p>changed</p>")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+import unittest
+
+from depgraph import DependencyGraph
+
+
+class TestDependencyGraph(unittest.TestCase):
+    def test_dependents_and_referrers(self):
+        graph = DependencyGraph()
+        graph.add_page("a.md", ["template.html", "partials/nav.html"], ["b.md"])
+        graph.add_page("b.md", ["layouts/blog.html", "partials/nav.html"])
+        graph.add_page("c.md", ["layouts/blog.html"], ["b.md", "b.md"])
+
+        self.assertEqual(graph.dependents(["partials/nav.html"]), {"a.md", "b.md"})
+        self.assertEqual(graph.dependents(["template.html"]), {"a.md"})
+        self.assertEqual(graph.referrers(["b.md"]), {"a.md", "c.md"})
+        self.assertEqual(graph.pages["c.md"]["references"], ["b.md"])
+
+        graph.remove_page("a.md")
+        self.assertEqual(graph.dependents(["partials/nav.html"]), {"b.md"})
+
+    def test_rebuild_set(self):
+        hashes = {"template.html": "t1", "layouts/blog.html": "l1", "partials/nav.html": "n1"}
+        graph = DependencyGraph()
+        graph.add_page("a.md", ["template.html", "partials/nav.html"])
+        graph.add_page("b.md", ["layouts/blog.html"])
+        graph.update_files(hashes.__getitem__)
+
+        self.assertEqual(graph.rebuild_set(hashes.__getitem__), set())
+
+        hashes["partials/nav.html"] = "n2"
+        self.assertEqual(graph.rebuild_set(hashes.__getitem__), {"a.md"})
+
+        def missing(path):
+            raise FileNotFoundError(path)
+
+        self.assertEqual(graph.rebuild_set(missing), {"a.md", "b.md"})
+
+        restored = DependencyGraph.from_dict(graph.to_dict())
+        self.assertEqual(restored.pages, graph.pages)
+        self.assertEqual(restored.files, graph.files)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import os
+import tempfile
+import unittest
+
+from discovery import PAGE_IGNORE, scan
+from main import discover_pages
+from fixtures import write
+
+
+class TestDiscovery(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        for relpath in (
+            "index.md",
+            "a-b.md",
+            "a/x.md",
+            "blog/post/index.md",
+            "blog/post/photo.png",
+            "blog/_partials/nav.md",
+            "blog/.hidden.md",
+            "drafts/wip.md",
+            "notes.draft.md",
+            "zeta/deep/er/page.md",
+        ):
+            write(os.path.join(self.root, relpath), relpath)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_scan_order_and_ignore(self):
+        entries = scan(self.root, PAGE_IGNORE, ".md")
+
+        self.assertEqual(
+            [entry.relpath for entry in entries],
+            [
+                os.path.join("a", "x.md"),
+                "a-b.md",
+                os.path.join("blog", "post", "index.md"),
+                "index.md",
+                os.path.join("zeta", "deep", "er", "page.md"),
+            ],
+        )
+        self.assertEqual(entries[0].path, os.path.join(self.root, "a", "x.md"))
+        self.assertEqual(entries[0].size, len("a/x.md"))
+        self.assertEqual(entries[0].mtime_ns, os.stat(entries[0].path).st_mtime_ns)
+
+        self.assertEqual(len(scan(self.root)), 10)
+        self.assertEqual(scan(os.path.join(self.root, "missing")), [])
+
+    def test_parallel_scan_matches_serial(self):
+        self.assertEqual(scan(self.root, PAGE_IGNORE, workers=4), scan(self.root, PAGE_IGNORE))
+
+    def test_discover_pages(self):
+        pages = discover_pages(self.root, "docs", PAGE_IGNORE + ("zeta",))
+
+        self.assertEqual(
+            [str(page.dest) for page in pages],
+            [
+                os.path.join("docs", "a", "x.html"),
+                os.path.join("docs", "a-b.html"),
+                os.path.join("docs", "blog", "post", "index.html"),
+                os.path.join("docs", "index.html"),
+            ],
+        )
+        self.assertEqual(pages[-1].size, len("index.md"))
+
+
+if __name__ == "__main__":
+    unittest.main()
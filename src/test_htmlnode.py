@@ -1,3 +1,4 @@
+import io
 import unittest
 
 from htmlnode import HTMLNode, LeafNode, ParentNode
@@ -22,6 +23,20 @@ class TestHTMLNode(unittest.TestCase):
         self.assertEqual(node2.props_to_html(), 'class="colored margin" id="paragraph"')
         self.assertEqual(node3.props_to_html(), "")
 
+    def test_props_and_slots(self):
+        node = HTMLNode("a", "link", None, {"href": "/blog"})
+
+        self.assertEqual(node.props, {"href": "/blog"})
+        self.assertEqual(repr(node), "HTMLNode(a, link, None, {'href': '/blog'})")
+        self.assertEqual(node, HTMLNode("a", "link", None, {"href": "/blog"}))
+        self.assertNotEqual(node, HTMLNode("a", "link", None, {"href": "/"}))
+
+        with self.assertRaises(TypeError):
+            node.props["id"] = "tom"
+        node.props = {"href": "/tom", "id": "tom"}
+        self.assertEqual(node.props_to_html(), 'href="/tom" id="tom"')
+        self.assertFalse(hasattr(LeafNode("p", "text"), "__dict__"))
+
 
 class TestLeafNode(unittest.TestCase):
     def test_to_html_method(self):
@@ -108,6 +123,57 @@ class TestParentNode(unittest.TestCase):
             "<ul><li>Normal text</li><li><i>italic text</i></li><li><span>Normal text <b>with bold text</b></span></li></ul>",
         )
 
+    def test_write_html_method(self):
+        node = ParentNode(
+            "div",
+            [
+                ParentNode("p", [LeafNode(None, "Normal text "), LeafNode("b", "bold")]),
+                LeafNode("a", "link", {"href": "/blog"}),
+            ],
+        )
+
+        buffer = io.StringIO()
+        node.write_html(buffer)
+
+        self.assertEqual(buffer.getvalue(), node.to_html())
+        self.assertEqual(
+            list(node.iter_html()),
+            ["<div>", "<p>", "Normal text ", "<b>bold</b>", "</p>", '<a href="/blog">link</a>', "</div>"],
+        )
+
+    def test_props_on_parent(self):
+        node = ParentNode("h2", [LeafNode(None, "Intro "), LeafNode("b", "bold")], {"id": "intro-bold"})
+        self.assertEqual(node.to_html(), '<h2 id="intro-bold">Intro <b>bold</b></h2>')
+
+    def test_deeply_nested_to_html(self):
+        depth = 5000
+        node = LeafNode("i", "deep")
+        for _ in range(depth):
+            node = ParentNode("li", [node])
+
+        self.assertEqual(node.to_html(), "<li>" * depth + "<i>deep</i>" + "</li>" * depth)
+
+        with self.assertRaises(ValueError):
+            ParentNode("ul", [ParentNode("li", None)]).to_html()
+
+    def test_minified_html(self):
+        node = ParentNode(
+            "div",
+            [
+                LeafNode("p", "Some   text\nacross lines"),
+                ParentNode("pre", [LeafNode("code", "def f():\n    return 1\n")]),
+                ParentNode("p", [LeafNode(None, "after \n "), LeafNode("b", "bold")]),
+            ],
+        )
+
+        self.assertEqual(
+            node.to_html(minify=True),
+            "<div><p>Some text across lines</p><pre><code>def f():\n    return 1\n</code></pre>"
+            "<p>after <b>bold</b></p></div>",
+        )
+        self.assertEqual(LeafNode("pre", "a  b").to_html(minify=True), "<pre>a  b</pre>")
+        self.assertEqual(node.to_html(), "".join(node.iter_html()))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,34 @@
+import unittest
+
+from links import LinkIndex, is_internal, resolve
+
+
+class TestLinks(unittest.TestCase):
+    def test_is_internal(self):
+        self.assertTrue(is_internal("/blog/tom"))
+        self.assertTrue(is_internal("../contact"))
+        self.assertFalse(is_internal("https://www.boot.dev"))
+        self.assertFalse(is_internal("mailto:author@example.com"))
+        self.assertFalse(is_internal("//cdn.example.com/lib.js"))
+        self.assertFalse(is_internal("#section"))
+
+    def test_resolve(self):
+        self.assertEqual(resolve("/blog/tom/index.html", "/contact"), "/contact")
+        self.assertEqual(resolve("/blog/tom/index.html", "../majesty"), "/blog/majesty")
+        self.assertEqual(resolve("/blog/tom/index.html", "../../"), "/")
+        self.assertEqual(resolve("/index.html", "/images/my%20tom.png?v=1#top"), "/images/my tom.png")
+
+    def test_broken(self):
+        index = LinkIndex()
+        index.add("/index.html", ["/blog/tom", "/blog/missing", "https://www.boot.dev", "/"], ["/images/tom.png"])
+        index.add("/blog/tom/index.html", ["../../contact/", "/index.html#top"], ["/images/gone.png"])
+        index.add("/contact/index.html")
+
+        self.assertEqual(
+            index.broken(["images/tom.png", "index.css"]),
+            [("/blog/tom/index.html", "/images/gone.png"), ("/index.html", "/blog/missing")],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
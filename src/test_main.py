@@ -0,0 +1,234 @@
+import io
+import os
+import tempfile
+import contextlib
+import unittest
+
+import main
+
+from main import generate_page, generate_pages_recursive
+from cache import PageCache
+from manifest import Manifest
+from search import SearchIndex
+from template import Template
+from fixtures import write, read
+
+TEMPLATE = "<title>{{ Title }}</title><body>{{ Content }}</body>"
+
+
+class TestGeneratePages(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.content = os.path.join(self.tmp.name, "content")
+        self.dest = os.path.join(self.tmp.name, "docs")
+        self.template = os.path.join(self.tmp.name, "template.html")
+        write(self.template, TEMPLATE)
+        for i in range(6):
+            write(os.path.join(self.content, f"post{i}", "index.md"), f"# Post {i}\n\nBody {i}\n")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_parallel_matches_serial(self):
+        serial_dest = os.path.join(self.tmp.name, "serial")
+        generate_pages_recursive(self.content, self.template, serial_dest, "/", jobs=1)
+        generate_pages_recursive(self.content, self.template, self.dest, "/", jobs=3)
+
+        for i in range(6):
+            page = os.path.join(f"post{i}", "index.html")
+            self.assertEqual(read(os.path.join(self.dest, page)), read(os.path.join(serial_dest, page)))
+        self.assertEqual(
+            read(os.path.join(self.dest, "post0", "index.html")),
+            '<title>Post 0</title><body><div><h1 id="post-0">Post 0</h1><p>Body 0</p></div></body>',
+        )
+
+    def test_parallel_errors_do_not_stop_other_pages(self):
+        write(os.path.join(self.content, "broken", "index.md"), "No title here\n")
+
+        with self.assertRaises(Exception):
+            generate_pages_recursive(self.content, self.template, self.dest, "/", jobs=3)
+
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "broken", "index.html")))
+        for i in range(6):
+            self.assertTrue(os.path.exists(os.path.join(self.dest, f"post{i}", "index.html")))
+
+    def test_cached_page_matches_uncached_page(self):
+        source = os.path.join(self.content, "code", "index.md")
+        write(source, '# Code\n\n[home](/) ![logo](/logo.png)\n\n```\n<a href="/x">x</a>\n```')
+        template = Template(TEMPLATE, "/base/")
+        cache = PageCache(os.path.join(self.tmp.name, "cache"))
+
+        uncached = os.path.join(self.dest, "uncached.html")
+        generate_page(source, template, uncached, "/base/")
+        self.assertIn('<a href="/base/">home</a>', read(uncached))
+        # code blocks are copied verbatim, basepath and all
+        self.assertIn('<code><a href="/x">x</a>', read(uncached))
+
+        for hit in (False, True):
+            cached = os.path.join(self.dest, f"cached-{hit}.html")
+            self.assertEqual(generate_page(source, template, cached, "/base/", cache).cache_hit, hit)
+            self.assertEqual(read(cached), read(uncached))
+
+        generate_page(source, Template(TEMPLATE), cached, "/", cache)
+        generate_page(source, Template(TEMPLATE), uncached, "/")
+        self.assertEqual(read(cached), read(uncached))
+
+    def test_full_build_replaces_manifest(self):
+        cwd = os.getcwd()
+        os.chdir(self.tmp.name)
+        self.addCleanup(os.chdir, cwd)
+        write(os.path.join("content", "index.md"), "# Home\n\n![logo](/logo.png)")
+        index = os.path.join("docs", "index.html")
+
+        main.main(["/", "--incremental", "--quiet"])
+        main.main(["/base/", "--quiet"])
+        self.assertIn('src="/base/logo.png"', read(index))
+        entry = Manifest.load(main.MANIFEST_PATH).pages[os.path.join("content", "index.md")]
+        self.assertEqual(entry["basepath"], "/base/")
+
+        main.main(["/", "--incremental", "--quiet"])
+        self.assertIn('src="/logo.png"', read(index))
+
+    def test_full_build_syncs_in_place(self):
+        cwd = os.getcwd()
+        os.chdir(self.tmp.name)
+        self.addCleanup(os.chdir, cwd)
+        write(os.path.join("content", "index.md"), "# Home")
+        write(os.path.join("static", "site.css"), "body {}")
+
+        main.main(["/", "--quiet", "--search"])
+        css = os.path.join("docs", "site.css")
+        os.utime(css, ns=(1, 1))
+        os.utime(os.path.join("static", "site.css"), ns=(1, 1))
+        write(os.path.join("docs", "old", "stale.html"), "stale")
+        write(os.path.join("docs", "index.html.gz"), "stale")
+
+        with self.assertLogs("ssg", "INFO") as logs:
+            main.main(["/"])
+
+        self.assertIn("Synced static assets: 0 copied, 0 removed, 1 unchanged", "\n".join(logs.output))
+        self.assertEqual(os.stat(css).st_mtime_ns, 1)
+        self.assertEqual(
+            sorted(os.listdir("docs")),
+            sorted(["index.html", "site.css", "post0", "post1", "post2", "post3", "post4", "post5"]),
+        )
+
+    def test_quiet_profile_still_prints_report(self):
+        cwd = os.getcwd()
+        os.chdir(self.tmp.name)
+        self.addCleanup(os.chdir, cwd)
+        write(os.path.join("content", "index.md"), "# Home")
+
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            main.main(["/", "--quiet", "--profile"])
+
+        self.assertIn("index.md", output.getvalue())
+        self.assertTrue(os.path.exists(os.path.join(".cache", "build-report.json")))
+
+    def test_streamed_page_matches_buffered_page(self):
+        source = os.path.join(self.content, "big", "index.md")
+        blocks = ["Intro with a [link](/blog)", "# Big page", "```\ncode\n\nblock\n```"]
+        blocks += [f"* item **{i}**\n* next" for i in range(200)]
+        write(source, "\n\n".join(blocks))
+        template = Template(TEMPLATE, "/site/")
+
+        buffered = os.path.join(self.dest, "buffered.html")
+        streamed = os.path.join(self.dest, "streamed.html")
+        generate_page(source, template, buffered, "/site/")
+
+        threshold = main.STREAM_THRESHOLD
+        main.STREAM_THRESHOLD = 0
+        try:
+            generate_page(source, template, streamed, "/site/")
+            write(source, "No title here")
+            with self.assertRaises(Exception):
+                generate_page(source, template, os.path.join(self.dest, "untitled.html"), "/site/")
+        finally:
+            main.STREAM_THRESHOLD = threshold
+
+        self.assertEqual(read(streamed), read(buffered))
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "untitled.html")))
+
+    def test_toc_slot(self):
+        source = os.path.join(self.content, "guide", "index.md")
+        write(source, "# Guide\n\n## Install\n\nText\n\n### Linux\n\nMore\n\n## Use\n\nDone")
+        template = Template("<nav>{{ TOC }}</nav>{{ Content }}")
+        toc = '<nav><ul><li><a href="#install">Install</a><ul><li><a href="#linux">Linux</a></li></ul></li>'
+        toc += '<li><a href="#use">Use</a></li></ul></nav>'
+
+        buffered = os.path.join(self.dest, "buffered.html")
+        streamed = os.path.join(self.dest, "streamed.html")
+        generate_page(source, template, buffered, "/")
+        threshold = main.STREAM_THRESHOLD
+        main.STREAM_THRESHOLD = 0
+        try:
+            generate_page(source, template, streamed, "/")
+        finally:
+            main.STREAM_THRESHOLD = threshold
+
+        self.assertTrue(read(buffered).startswith(toc + '<div><h1 id="guide">Guide</h1><h2 id="install">'))
+        self.assertEqual(read(streamed), read(buffered))
+
+        generate_page(os.path.join(self.content, "post0", "index.md"), template, buffered, "/")
+        self.assertTrue(read(buffered).startswith("<nav></nav><div>"))
+
+    def test_partial_change_rebuilds_only_dependent_pages(self):
+        write(os.path.join(self.tmp.name, "layouts", "post0.html"), "{{> header }}<main>{{ Content }}</main>")
+        write(os.path.join(self.tmp.name, "partials", "header.html"), "<header>{{ Title }}</header>")
+        manifest = Manifest(os.path.join(self.tmp.name, "manifest.json"))
+
+        def build():
+            with self.assertLogs("ssg", "INFO") as logs:
+                generate_pages_recursive(self.content, self.template, self.dest, "/", manifest)
+            return [line for line in logs.output if "Generating page" in line]
+
+        self.assertEqual(len(build()), 6)
+        self.assertEqual(
+            read(os.path.join(self.dest, "post0", "index.html")),
+            '<header>Post 0</header><main><div><h1 id="post-0">Post 0</h1><p>Body 0</p></div></main>',
+        )
+
+        write(os.path.join(self.tmp.name, "partials", "header.html"), "<nav>{{ Title }}</nav>")
+        generated = build()
+        self.assertEqual(len(generated), 1)
+        self.assertIn(os.path.join("post0", "index.md"), generated[0])
+        self.assertTrue(read(os.path.join(self.dest, "post0", "index.html")).startswith("<nav>Post 0</nav>"))
+
+        os.remove(os.path.join(self.tmp.name, "layouts", "post0.html"))
+        generated = build()
+        self.assertEqual(len(generated), 1)
+        self.assertTrue(read(os.path.join(self.dest, "post0", "index.html")).startswith("<title>Post 0</title>"))
+
+    def test_search_index_reuses_unchanged_pages(self):
+        manifest = Manifest(os.path.join(self.tmp.name, "manifest.json"))
+        generate_pages_recursive(self.content, self.template, self.dest, "/", manifest, search_index=SearchIndex())
+
+        write(os.path.join(self.content, "post1", "index.md"), "# Post 1\n\nRewritten body\n")
+        search_index = SearchIndex()
+        with self.assertLogs("ssg", "INFO") as logs:
+            generate_pages_recursive(self.content, self.template, self.dest, "/", manifest, search_index=search_index)
+
+        self.assertEqual(len([line for line in logs.output if "Generating page" in line]), 1)
+        self.assertEqual(len(search_index.pages), 6)
+        self.assertEqual(
+            search_index.pages["/post0/index.html"],
+            {"title": "Post 0", "snippet": "Body 0", "terms": {"post": 1, "body": 1}},
+        )
+        self.assertEqual(search_index.pages["/post1/index.html"]["terms"], {"post": 1, "rewritten": 1, "body": 1})
+
+    def test_minified_build(self):
+        write(self.template, "<html>\n  <title> {{ Title }} </title>\n  <body>\n    {{ Content }}\n  </body>\n</html>")
+        write(os.path.join(self.content, "post0", "index.md"), "# Post 0\n\nBody  over\ntwo lines\n\n```\n  code\n```")
+
+        generate_pages_recursive(self.content, self.template, self.dest, "/", minify=True)
+
+        self.assertEqual(
+            read(os.path.join(self.dest, "post0", "index.html")),
+            '<html><title>Post 0</title><body><div><h1 id="post-0">Post 0</h1><p>Body over two lines</p>'
+            "<pre><code>  code\n</code></pre></div></body></html>",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
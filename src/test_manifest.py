@@ -0,0 +1,72 @@
+import os
+import time
+import tempfile
+import unittest
+
+from manifest import Manifest, hash_bytes, remove_output
+
+
+class TestManifest(unittest.TestCase):
+    def test_is_fresh(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            output = os.path.join(tmp, "index.html")
+            with open(output, "w") as f:
+                f.write("<p>page</p>")
+
+            manifest = Manifest(os.path.join(tmp, "manifest.json"))
+            digest = hash_bytes(b"# Title")
+            self.assertFalse(manifest.is_fresh("index.md", digest, "t", "/", output))
+
+            manifest.record("index.md", digest, "t", "/", output)
+            self.assertTrue(manifest.is_fresh("index.md", digest, "t", "/", output))
+            self.assertFalse(manifest.is_fresh("index.md", hash_bytes(b"# Other"), "t", "/", output))
+            self.assertFalse(manifest.is_fresh("index.md", digest, "t2", "/", output))
+            self.assertFalse(manifest.is_fresh("index.md", digest, "t", "/blog/", output))
+
+            os.remove(output)
+            self.assertFalse(manifest.is_fresh("index.md", digest, "t", "/", output))
+
+    def test_known_hash(self):
+        manifest = Manifest("unused")
+        manifest.record("a.md", "h1", "t", "/", "docs/a.html", size=10, mtime_ns=1000)
+        manifest.record("b.md", "h2", "t", "/", "docs/b.html", size=10, mtime_ns=time.time_ns())
+
+        self.assertEqual(manifest.known_hash("a.md", 10, 1000), "h1")
+        self.assertIsNone(manifest.known_hash("a.md", 11, 1000))
+        self.assertIsNone(manifest.known_hash("a.md", 10, 2000))
+        self.assertIsNone(manifest.known_hash("c.md", 10, 1000))
+        # just modified sources may change again within the same mtime
+        self.assertIsNone(manifest.known_hash("b.md", 10, manifest.pages["b.md"]["mtime_ns"]))
+
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "cache", "manifest.json")
+            manifest = Manifest(path)
+            manifest.record("a.md", "h1", "t", "/", "docs/a.html")
+            manifest.save()
+
+            loaded = Manifest.load(path)
+            self.assertEqual(loaded.pages, manifest.pages)
+            self.assertEqual(Manifest.load(os.path.join(tmp, "missing.json")).pages, {})
+
+    def test_prune_and_remove_output(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            output = os.path.join(tmp, "blog", "post", "index.html")
+            os.makedirs(os.path.dirname(output))
+            with open(output, "w") as f:
+                f.write("<p>post</p>")
+
+            manifest = Manifest(os.path.join(tmp, "manifest.json"))
+            manifest.record("index.md", "h1", "t", "/", os.path.join(tmp, "index.html"))
+            manifest.record("post.md", "h2", "t", "/", output)
+
+            self.assertEqual(manifest.prune(["index.md"]), [output])
+            self.assertEqual(list(manifest.pages), ["index.md"])
+
+            remove_output(output, tmp)
+            self.assertFalse(os.path.exists(os.path.join(tmp, "blog")))
+            self.assertTrue(os.path.exists(tmp))
+
+
+if __name__ == "__main__":
+    unittest.main()
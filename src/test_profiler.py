@@ -0,0 +1,53 @@
+import os
+import json
+import tempfile
+import unittest
+
+from profiler import NULL_PROFILE, BuildProfiler, PageProfile, format_report
+
+
+class TestProfiler(unittest.TestCase):
+    def test_page_profile(self):
+        profile = PageProfile("content/index.md")
+        with profile.stage("read"):
+            pass
+        with profile.stage("read"):
+            pass
+        with profile.stage("write"):
+            pass
+
+        self.assertEqual(sorted(profile.stages), ["read", "write"])
+        self.assertAlmostEqual(profile.seconds, profile.stages["read"] + profile.stages["write"])
+
+        with NULL_PROFILE.stage("read"):
+            pass
+
+    def test_report(self):
+        profiler = BuildProfiler()
+        with profiler.stage("discovery"):
+            pass
+
+        for i, seconds in enumerate([0.3, 0.1, 0.2]):
+            profile = PageProfile(f"page{i}.md")
+            profile.stages = {"convert": seconds, "write": 0.01}
+            profile.bytes_in = 100
+            profile.bytes_out = 300
+            profiler.add_page(profile)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            # the report directory does not have to exist yet
+            path = os.path.join(tmp, ".cache", "report.json")
+            report = profiler.write_report(path, top=2)
+            with open(path) as f:
+                self.assertEqual(json.load(f), report)
+
+        self.assertEqual(report["pages"], 3)
+        self.assertEqual(report["bytes_out"], 900)
+        self.assertEqual([page["source"] for page in report["slowest_pages"]], ["page0.md", "page2.md"])
+        self.assertAlmostEqual(report["page_stages"]["convert"], 0.6)
+        self.assertIn("discovery", report["build_stages"])
+        self.assertIn("page0.md", format_report(report))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+import unittest
+
+from htmlnode import ParentNode
+from render import render, render_many
+from template import Template
+
+DOCS = [f"# Post {i}\n\nSee [home](/index) for **more**." for i in range(40)]
+
+
+class TestRender(unittest.TestCase):
+    def test_render(self):
+        self.assertEqual(render("Hello **world**"), "<div><p>Hello <b>world</b></p></div>")
+        self.assertIsInstance(render("Hello", output="node"), ParentNode)
+        self.assertEqual(
+            render("# Title\n\n[home](/)", basepath="/site/", template=Template("<title>{{ Title }}</title>{{ Content }}")),
+            '<title>Title</title><div><h1 id="title">Title</h1><p><a href="/site/">home</a></p></div>',
+        )
+
+        with self.assertRaises(ValueError):
+            render("Hello", output="pdf")
+
+    def test_render_node_is_not_shared(self):
+        markdown = "See [home](/) and **more**"
+        node = render(markdown, output="node")
+        node.children[0].children[1].props = {"href": "/changed"}
+        node.children[0].children[3].value = "less"
+
+        self.assertEqual(render(markdown), '<div><p>See <a href="/">home</a> and <b>more</b></p></div>')
+
+    def test_render_many_matches_render(self):
+        expected = [render(doc) for doc in DOCS]
+
+        serial = sorted(render_many(DOCS, chunksize=7))
+        parallel = sorted(render_many(iter(DOCS), workers=2, chunksize=3))
+
+        self.assertEqual([result.value for result in serial], expected)
+        self.assertEqual([result.value for result in parallel], expected)
+        self.assertEqual([result.index for result in parallel], list(range(len(DOCS))))
+
+    def test_render_many_reports_errors(self):
+        results = sorted(render_many(["ok", "**broken", "fine"], workers=2, chunksize=1), key=lambda r: r.index)
+
+        self.assertEqual([result.error is None for result in results], [True, False, True])
+        self.assertEqual(results[1].value, None)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import os
+import json
+import tempfile
+import unittest
+
+from search import SearchIndex, page_url
+
+
+def entry(title, terms, snippet=""):
+    return {"title": title, "snippet": snippet, "terms": terms}
+
+
+def read_json(path):
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+class TestSearch(unittest.TestCase):
+    def test_page_url(self):
+        self.assertEqual(page_url("/index.html", "/"), "/")
+        self.assertEqual(page_url("/blog/tom/index.html", "/site/"), "/site/blog/tom/")
+        self.assertEqual(page_url("/about.html", "/site"), "/site/about.html")
+
+    def test_write_shards(self):
+        index = SearchIndex()
+        index.add("/b/index.html", entry("B", {"hobbit": 1, "ring": 3}, "About rings"))
+        index.add("/a/index.html", entry("A", {"ring": 1, "elf": 2}))
+
+        with tempfile.TemporaryDirectory() as root:
+            written, removed = index.write(root, "/site/", shard_size=2)
+            search = os.path.join(root, "search")
+            self.assertEqual(sorted(os.listdir(search)), ["index.json", "terms-0.json", "terms-1.json"])
+            self.assertEqual(len(written), 3)
+            self.assertEqual(removed, [])
+
+            self.assertEqual(
+                read_json(os.path.join(search, "index.json")),
+                {
+                    "version": 1,
+                    "pages": [["/site/a/", "A", ""], ["/site/b/", "B", "About rings"]],
+                    "shards": ["elf", "ring"],
+                },
+            )
+            self.assertEqual(read_json(os.path.join(search, "terms-0.json")), {"elf": [0], "hobbit": [1]})
+            # pages with the most occurrences come first
+            self.assertEqual(read_json(os.path.join(search, "terms-1.json")), {"ring": [1, 0]})
+
+            # unchanged files are left alone and shards that are no longer needed removed
+            index.pages.pop("/b/index.html")
+            written, removed = index.write(root, "/site/", shard_size=2)
+            self.assertEqual(sorted(os.listdir(search)), ["index.json", "terms-0.json"])
+            self.assertEqual(removed, [os.path.join(search, "terms-1.json")])
+            self.assertEqual(len(written), 2)
+
+            written, removed = index.write(root, "/site/", shard_size=2)
+            self.assertEqual((written, removed), ([], []))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+import os
+import tempfile
+import unittest
+
+from main import generate_pages_recursive
+from manifest import Manifest
+from shard import SHARD_MANIFEST_NAME, merge_shards, parse_shard, shard_of
+from fixtures import write
+
+
+def read_tree(root) -> dict:
+    files = {}
+    for directory, _, names in os.walk(root):
+        for name in names:
+            path = os.path.join(directory, name)
+            with open(path, "r") as f:
+                files[os.path.relpath(path, root)] = f.read()
+
+    return files
+
+
+class TestShard(unittest.TestCase):
+    def test_parse_shard(self):
+        self.assertEqual(parse_shard("2/4"), (2, 4))
+        for value in ("0/4", "5/4", "2", "a/b"):
+            with self.assertRaises(ValueError):
+                parse_shard(value)
+
+    def test_shard_of_is_stable_and_balanced(self):
+        keys = [f"section{i % 7}/page{i}/index.md" for i in range(3000)]
+        shards = {key: shard_of(key, 4) for key in keys}
+
+        counts = [list(shards.values()).count(shard) for shard in range(1, 5)]
+        self.assertTrue(all(600 < count < 900 for count in counts), counts)
+        # adding a fifth shard only moves pages onto the new shard
+        moved = [key for key in keys if shard_of(key, 5) != shards[key]]
+        self.assertTrue(all(shard_of(key, 5) == 5 for key in moved))
+
+    def test_sharded_build_merges_into_full_build(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            content = os.path.join(tmp, "content")
+            template = os.path.join(tmp, "template.html")
+            write(template, "<title>{{ Title }}</title>{{ Content }}")
+            for i in range(12):
+                write(os.path.join(content, f"section{i % 3}", f"post{i}", "index.md"), f"# Post {i}\n\n[home](/)")
+            write(os.path.join(content, "index.md"), "# Home")
+
+            full = os.path.join(tmp, "full")
+            generate_pages_recursive(content, template, full, "/")
+
+            shard_dirs = []
+            for shard in range(1, 4):
+                shard_dir = os.path.join(tmp, f"shard{shard}")
+                manifest = Manifest(os.path.join(shard_dir, SHARD_MANIFEST_NAME))
+                generate_pages_recursive(content, template, shard_dir, "/", manifest, shard=(shard, 3))
+                manifest.save()
+                shard_dirs.append(shard_dir)
+
+            docs = os.path.join(tmp, "docs")
+            write(os.path.join(docs, "stale.html"), "old")
+            manifest, copied, removed = merge_shards(shard_dirs, docs, os.path.join(tmp, "manifest.json"), workers=2)
+
+            self.assertEqual(read_tree(docs), read_tree(full))
+            self.assertEqual(len(copied), 13)
+            self.assertEqual(removed, [os.path.join(docs, "stale.html")])
+            self.assertEqual(len(manifest.pages), 13)
+            self.assertTrue(all(entry["output"].startswith(docs) for entry in manifest.pages.values()))
+
+            # merging again leaves identical files alone
+            self.assertEqual(merge_shards(shard_dirs, docs, os.path.join(tmp, "manifest.json"))[1:], ([], []))
+
+
+if __name__ == "__main__":
+    unittest.main()
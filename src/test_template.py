@@ -0,0 +1,109 @@
+import os
+import tempfile
+import unittest
+
+from template import Template, TemplateSet, apply_basepath, minify_html
+from fixtures import write
+
+
+class TestTemplate(unittest.TestCase):
+    def test_render(self):
+        template = Template("<title>{{ Title }}</title><main>{{ Content }}</main>")
+
+        self.assertEqual(template.placeholders, ["Title", "Content"])
+        self.assertEqual(
+            template.render({"Title": "Home", "Content": "<p>Hi</p>"}),
+            "<title>Home</title><main><p>Hi</p></main>",
+        )
+
+    def test_render_named_placeholders(self):
+        template = Template('<meta name="author" content="{{Author}}">{{ Content }}{{ Missing }}')
+
+        self.assertEqual(
+            template.render({"Author": "Tolkien", "Content": "<p>Hi</p>"}),
+            '<meta name="author" content="Tolkien"><p>Hi</p>{{ Missing }}',
+        )
+
+    def test_basepath_only_applies_to_template_literals(self):
+        template = Template('<link href="/index.css"><img src="/logo.png">{{ Content }}', "/blog/")
+
+        self.assertEqual(
+            template.render({"Content": '<code>href="/raw"</code>'}),
+            '<link href="/blog/index.css"><img src="/blog/logo.png"><code>href="/raw"</code>',
+        )
+
+    def test_apply_basepath(self):
+        self.assertEqual(apply_basepath('<a href="/x">', "/"), '<a href="/x">')
+        self.assertEqual(apply_basepath('<a href="/x">', "/site/"), '<a href="/site/x">')
+
+    def test_minify(self):
+        source = """<!DOCTYPE html>
+<html>
+<head>
+    <title> {{ Title }} </title>
+    <script>
+        let a = 1
+        let b = 2
+    </script>
+</head>
+<body>
+    <p>Some <b>bold</b>   <i>text</i></p>
+    <pre>  keep
+  this</pre>
+    {{ Content }}
+</body>
+</html>
+"""
+        self.assertEqual(
+            minify_html(source),
+            "<!DOCTYPE html><html><head><title>{{ Title }}</title>"
+            "<script>\n        let a = 1\n        let b = 2\n    </script>"
+            "</head><body><p>Some <b>bold</b> <i>text</i></p><pre>  keep\n  this</pre>{{ Content }}</body></html>",
+        )
+
+        template = Template(source, "/", minify=True)
+        self.assertEqual(template.placeholders, ["Title", "Content"])
+        self.assertTrue(template.minify)
+
+    def test_partials(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            partials = os.path.join(tmp, "partials")
+            write(os.path.join(partials, "head.html"), '<link href="/index.css">{{> nav/menu }}')
+            write(os.path.join(partials, "nav", "menu.html"), "<nav>{{ Title }}</nav>")
+            write(os.path.join(tmp, "template.html"), "{{> head }}<main>{{ Content }}</main>")
+
+            template = Template.from_file(os.path.join(tmp, "template.html"), "/blog/", partials)
+            self.assertEqual(
+                template.render({"Title": "Home", "Content": "<p>Hi</p>"}),
+                '<link href="/blog/index.css"><nav>Home</nav><main><p>Hi</p></main>',
+            )
+            self.assertEqual(
+                template.dependencies,
+                [
+                    os.path.join(tmp, "template.html"),
+                    os.path.join(partials, "head.html"),
+                    os.path.join(partials, "nav/menu.html"),
+                ],
+            )
+
+            write(os.path.join(partials, "loop.html"), "{{> loop }}")
+            with self.assertRaises(Exception):
+                Template("{{> loop }}", "/", partials)
+
+    def test_template_set_layouts(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            default = os.path.join(tmp, "template.html")
+            write(default, "<main>{{ Content }}</main>")
+            write(os.path.join(tmp, "layouts", "blog.html"), "<article>{{ Content }}</article>")
+
+            templates = TemplateSet(default)
+            self.assertEqual(templates.for_page("index.md").path, default)
+            self.assertEqual(templates.for_page("blog.md").path, default)
+            self.assertEqual(templates.for_page(os.path.join("docs", "index.md")).path, default)
+            blog = templates.for_page(os.path.join("blog", "post", "index.md"))
+            self.assertEqual(blog.path, os.path.join(tmp, "layouts", "blog.html"))
+            self.assertIs(templates.for_page(os.path.join("blog", "index.md")), blog)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,6 +2,8 @@ import unittest
 
 from htmlnode import ParentNode, HTMLNode, LeafNode
 
+import textnode
+
 from textnode import (
     TextNode,
     TextType,
@@ -16,6 +18,12 @@ from textnode import (
     block_to_block_type,
     markdown_to_html_node,
     extract_title,
+    markdown_to_document,
+    outline_to_html_node,
+    slugify,
+    Document,
+    InlineMemo,
+    INLINE_MEMO,
 )
 
 
@@ -65,6 +73,23 @@ class TestTextNode(unittest.TestCase):
             "HTMLNode(img, , None, {'src': 'https://images.pexels.com/photos/276267/pexels-photo-276267.jpeg', 'alt': 'a image here'})",
         )
 
+    def test_text_node_to_html_node_basepath(self):
+        link = TextNode("home", TextType.LINK, "/blog/tom")
+        image = TextNode("tom", TextType.IMAGE, "/images/tom.png")
+        external = TextNode("boot.dev", TextType.LINK, "https://www.boot.dev")
+
+        self.assertEqual(
+            text_node_to_html_node(link, "/site/").to_html(), '<a href="/site/blog/tom">home</a>'
+        )
+        self.assertEqual(
+            text_node_to_html_node(image, "/site/").to_html(),
+            '<img src="/site/images/tom.png" alt="tom"></img>',
+        )
+        self.assertEqual(
+            text_node_to_html_node(external, "/site/").to_html(),
+            '<a href="https://www.boot.dev">boot.dev</a>',
+        )
+
     def test_split_nodes_delimiter(self):
         # node list / delimiter / type
         nodes = [
@@ -215,6 +240,59 @@ class TestTextNode(unittest.TestCase):
             ],
         )
 
+    def test_text_to_textnodes_single_pass(self):
+        text = "A _quiet_ [link](https://x.dev/a_b) then **bold** and ![img](/a_b.png)"
+
+        self.assertEqual(
+            text_to_textnodes(text),
+            [
+                TextNode("A ", TextType.TEXT),
+                TextNode("quiet", TextType.ITALIC),
+                TextNode(" ", TextType.TEXT),
+                TextNode("link", TextType.LINK, "https://x.dev/a_b"),
+                TextNode(" then ", TextType.TEXT),
+                TextNode("bold", TextType.BOLD),
+                TextNode(" and ", TextType.TEXT),
+                TextNode("img", TextType.IMAGE, "/a_b.png"),
+            ],
+        )
+        self.assertEqual(text_to_textnodes(""), [])
+
+        with self.assertRaises(Exception):
+            text_to_textnodes("This is **unclosed bold")
+
+    def test_text_to_textnodes_images_before_links(self):
+        self.assertEqual(
+            text_to_textnodes("[WIP] see ![diagram](/img/d.png)"),
+            [TextNode("[WIP] see ", TextType.TEXT), TextNode("diagram", TextType.IMAGE, "/img/d.png")],
+        )
+        self.assertEqual(
+            text_to_textnodes("Step [1] ![shot](/s.png) done"),
+            [
+                TextNode("Step [1] ", TextType.TEXT),
+                TextNode("shot", TextType.IMAGE, "/s.png"),
+                TextNode(" done", TextType.TEXT),
+            ],
+        )
+        self.assertEqual(
+            text_to_textnodes("[a ![b](/c)](/d)"),
+            [TextNode("[a ", TextType.TEXT), TextNode("b", TextType.IMAGE, "/c"), TextNode("](/d)", TextType.TEXT)],
+        )
+
+    def test_text_to_textnodes_emphasis_around_images_and_links(self):
+        self.assertEqual(text_to_textnodes("*![logo](/l.png)*"), [TextNode("logo", TextType.IMAGE, "/l.png")])
+        self.assertEqual(
+            text_to_textnodes("See **[home](/)** now"),
+            [TextNode("See ", TextType.TEXT), TextNode("home", TextType.LINK, "/"), TextNode(" now", TextType.TEXT)],
+        )
+        # emphasis is split before links, so it is never part of a link's text
+        self.assertEqual(
+            text_to_textnodes("[a *b* c](/u)"),
+            [TextNode("[a ", TextType.TEXT), TextNode("b", TextType.ITALIC), TextNode(" c](/u)", TextType.TEXT)],
+        )
+        document = markdown_to_document("# T\n\nA *![logo](/l.png)* here")
+        self.assertEqual(document.images, ["/l.png"])
+
     def test_markdown_to_blocks(self):
         text = """
         # This is a heading
@@ -260,6 +338,15 @@ class TestTextNode(unittest.TestCase):
             ],
         )
 
+    def test_markdown_to_blocks_code_block(self):
+        text = "Intro\n\n```go\nfunc main(){\n\n    return\n}\n```\n  Outro  \n"
+
+        self.assertEqual(
+            markdown_to_blocks(text),
+            ["Intro", "```go\nfunc main(){\n\n    return\n}\n```", "Outro"],
+        )
+        self.assertEqual(markdown_to_blocks(""), [])
+
     def test_block_to_block_type(self):
         heading = "# This is a heading block"
         code = "```print('Hello world!')```"
@@ -274,6 +361,32 @@ class TestTextNode(unittest.TestCase):
         self.assertEqual(block_to_block_type(unordered), BlockType.UNORDERED_LIST)
         self.assertEqual(block_to_block_type(ordered), BlockType.ORDERED_LIST)
         self.assertEqual(block_to_block_type(paragraph), BlockType.PARAGRAPH)
+        self.assertEqual(block_to_block_type("Inline ```code``` fence"), BlockType.PARAGRAPH)
+        self.assertEqual(block_to_block_type("*emphasis* first"), BlockType.PARAGRAPH)
+        self.assertEqual(block_to_block_type("#hashtag"), BlockType.PARAGRAPH)
+
+    def test_register_block_type(self):
+        dispatch = {char: list(entries) for char, entries in textnode.BLOCK_DISPATCH.items()}
+        converters = dict(textnode.BLOCK_CONVERTERS)
+        try:
+            textnode.register_block_type(
+                "html",
+                "<",
+                lambda block, basepath, document: LeafNode(None, block),
+                lambda block: block.endswith(">"),
+            )
+
+            self.assertEqual(block_to_block_type("<hr>"), "html")
+            self.assertEqual(block_to_block_type("<not html"), BlockType.PARAGRAPH)
+            self.assertEqual(
+                markdown_to_html_node("# Title\n\n<hr>").to_html(),
+                '<div><h1 id="title">Title</h1><hr></div>',
+            )
+        finally:
+            textnode.BLOCK_DISPATCH.clear()
+            textnode.BLOCK_DISPATCH.update(dispatch)
+            textnode.BLOCK_CONVERTERS.clear()
+            textnode.BLOCK_CONVERTERS.update(converters)
 
     def test_markdown_to_html_node(self):
         markdown = """
@@ -291,7 +404,7 @@ class TestTextNode(unittest.TestCase):
             ParentNode(
                 "div",
                 [
-                    HTMLNode("h1", "This is a heading", None, None),
+                    HTMLNode("h1", "This is a heading", None, {"id": "this-is-a-heading"}),
                     HTMLNode(
                         "p",
                         None,
@@ -358,6 +471,107 @@ class TestTextNode(unittest.TestCase):
         with self.assertRaises(Exception):
             extract_title(markdown3)
 
+    def test_markdown_to_document(self):
+        markdown = """
+        Intro with ![logo](/images/logo.png) and a [link](/blog/tom).
+
+        # Main title
+
+        ## Section **one**
+
+        * see [boot.dev](https://www.boot.dev)
+        * and ![photo](/images/tom.png)
+        """
+        document = markdown_to_document(markdown)
+
+        self.assertEqual(document.node, markdown_to_html_node(markdown))
+        self.assertEqual(document.title, "Main title")
+        self.assertEqual(document.outline, [(1, "Main title", "main-title"), (2, "Section one", "section-one")])
+        self.assertEqual(document.first_image, ("logo", "/images/logo.png"))
+        self.assertEqual(document.links, ["/blog/tom", "https://www.boot.dev"])
+        self.assertEqual(document.images, ["/images/logo.png", "/images/tom.png"])
+        self.assertEqual(document.word_count, 13)
+        self.assertEqual(document.count_terms()["section"], 1)
+        self.assertEqual(document.terms["and"], 2)
+        self.assertNotIn("logo", document.terms)
+        self.assertEqual(document.snippet_text(), "Intro with and a link.")
+        self.assertEqual(len(document.blocks), 4)
+
+        restored = Document.from_metadata(document.metadata())
+        self.assertEqual(restored.metadata(), document.metadata())
+        self.assertIsNone(markdown_to_document("No title").title)
+
+    def test_heading_ids(self):
+        self.assertEqual(slugify("Hello, *World*!"), "hello-world")
+        self.assertEqual(slugify("C# & F#"), "c-f")
+        self.assertEqual(slugify("!!!"), "section")
+
+        document = markdown_to_document("# Setup\n\n## Setup\n\n## Setup\n\n### Setup-1\n\n## C# notes")
+        self.assertEqual(
+            [heading_id for _, _, heading_id in document.outline],
+            ["setup", "setup-1", "setup-2", "setup-1-1", "c-notes"],
+        )
+        self.assertIn('<h2 id="setup-2">Setup</h2>', document.node.to_html())
+
+    def test_outline_to_html_node(self):
+        outline = [(1, "Title", "title"), (2, "A", "a"), (3, "A.1", "a1"), (3, "A.2", "a2"), (2, "B", "b")]
+        self.assertEqual(
+            outline_to_html_node(outline).to_html(),
+            '<ul><li><a href="#a">A</a><ul><li><a href="#a1">A.1</a></li><li><a href="#a2">A.2</a></li></ul></li>'
+            '<li><a href="#b">B</a></li></ul>',
+        )
+        self.assertIsNone(outline_to_html_node([(1, "Title", "title")]))
+
+    def test_document_snippet(self):
+        document = markdown_to_document("# Title\n\nFirst  **bold**\npart.\n\n" + "word " * 100)
+        snippet = document.snippet_text()
+
+        self.assertTrue(snippet.startswith("First bold part. word word"))
+        self.assertTrue(snippet.endswith("word..."))
+        self.assertLessEqual(len(snippet), 160)
+        self.assertEqual(Document.from_metadata(document.metadata()).snippet_text(), snippet)
+
+    def test_inline_memo(self):
+        INLINE_MEMO.clear()
+        INLINE_MEMO.resize(64)
+        self.addCleanup(INLINE_MEMO.resize, 0)
+        self.addCleanup(INLINE_MEMO.clear)
+        markdown = "# Title\n\n* [Home](/)\n* [Blog](/blog)\n\nSee [Home](/)"
+        first = markdown_to_document(markdown, "/site/")
+        hits = INLINE_MEMO.hits
+        second = markdown_to_document(markdown, "/site/")
+
+        self.assertEqual(INLINE_MEMO.hits - hits, 4)
+        self.assertEqual(second.node, first.node)
+        self.assertEqual(second.metadata(), first.metadata())
+        self.assertEqual(second.links, ["/", "/blog", "/"])
+        self.assertEqual(
+            markdown_to_html_node("[Home](/)", "/other/").to_html(),
+            '<div><p><a href="/other/">Home</a></p></div>',
+        )
+
+        # trees never share the memoized leaves
+        tree = markdown_to_html_node("See [home](/) and **more**")
+        tree.children[0].children[1].props = {"href": "/evil"}
+        tree.children[0].children[3].value = "less"
+        again = markdown_to_html_node("See [home](/) and **more**")
+        self.assertEqual(again.to_html(), '<div><p>See <a href="/">home</a> and <b>more</b></p></div>')
+        self.assertIsNot(again.children[0].children[1], tree.children[0].children[1])
+
+    def test_inline_memo_eviction(self):
+        memo = InlineMemo(2)
+        memo.put("a", 1)
+        memo.put("b", 2)
+        self.assertEqual(memo.get("a"), 1)
+        memo.put("c", 3)
+
+        self.assertIsNone(memo.get("b"))
+        self.assertEqual(list(memo.entries), ["a", "c"])
+        self.assertEqual((memo.hits, memo.misses), (1, 1))
+
+        memo.resize(1)
+        self.assertEqual(list(memo.entries), ["c"])
+
 
 if __name__ == "__main__":
     unittest.main()
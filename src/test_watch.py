@@ -0,0 +1,126 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from main import generate_page
+from watch import ChangeTracker, SiteWatcher
+from fixtures import write, read
+
+
+class TestWatch(unittest.TestCase):
+    def test_change_tracker(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            write(os.path.join(tmp, "a.md"), "a")
+            write(os.path.join(tmp, "blog", "b.md"), "b")
+            write(os.path.join(tmp, "blog", "c.md"), "c")
+            write(os.path.join(tmp, "blog", ".c.md.swp"), "swap")
+
+            tracker = ChangeTracker([(tmp, (".*",))])
+            self.assertEqual(
+                sorted(tracker.files),
+                [os.path.join(tmp, "a.md"), os.path.join(tmp, "blog", "b.md"), os.path.join(tmp, "blog", "c.md")],
+            )
+            self.assertEqual(tracker.poll(), ([], []))
+
+            write(os.path.join(tmp, "a.md"), "a, edited in place")
+            write(os.path.join(tmp, "drafts", "d.md"), "d")
+            write(os.path.join(tmp, ".e.md.swp"), "swap")
+            os.remove(os.path.join(tmp, "blog", "c.md"))
+            changed, removed = tracker.poll()
+            self.assertEqual(sorted(changed), [os.path.join(tmp, "a.md"), os.path.join(tmp, "drafts", "d.md")])
+            self.assertEqual(removed, [os.path.join(tmp, "blog", "c.md")])
+
+            shutil.rmtree(os.path.join(tmp, "blog"))
+            self.assertEqual(tracker.poll(), ([], [os.path.join(tmp, "blog", "b.md")]))
+            self.assertEqual(tracker.poll(), ([], []))
+
+    def test_rebuilds_only_touched_pages(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            content = os.path.join(tmp, "content")
+            static = os.path.join(tmp, "static")
+            docs = os.path.join(tmp, "docs")
+            template = os.path.join(tmp, "template.html")
+            write(template, "<main>{{ Content }}</main>")
+            write(os.path.join(content, "index.md"), "# Home")
+            write(os.path.join(content, "blog", "index.md"), "# Blog")
+            write(os.path.join(static, "index.css"), "body {}")
+
+            watcher = SiteWatcher(content, static, template, docs, "/", generate_page)
+            self.assertEqual(watcher.pages(), [os.path.join(content, "blog", "index.md"), os.path.join(content, "index.md")])
+
+            write(os.path.join(content, "index.md"), "# Home again")
+            write(os.path.join(static, "site.js"), "run()")
+            os.remove(os.path.join(content, "blog", "index.md"))
+            os.makedirs(os.path.join(docs, "blog"))
+            write(os.path.join(docs, "blog", "index.html"), "<h1>Blog</h1>")
+
+            self.assertTrue(watcher.poll())
+            self.assertEqual(read(os.path.join(docs, "index.html")), '<main><div><h1 id="home-again">Home again</h1></div></main>')
+            self.assertEqual(read(os.path.join(docs, "site.js")), "run()")
+            self.assertFalse(os.path.exists(os.path.join(docs, "blog")))
+            self.assertFalse(watcher.poll())
+
+            write(template, "<article>{{ Content }}</article>")
+            self.assertTrue(watcher.poll())
+            self.assertEqual(read(os.path.join(docs, "index.html")), '<article><div><h1 id="home-again">Home again</h1></div></article>')
+
+    def test_minified_rebuilds(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            content = os.path.join(tmp, "content")
+            docs = os.path.join(tmp, "docs")
+            template = os.path.join(tmp, "template.html")
+            write(template, "<main>\n  {{ Content }}\n</main>")
+            write(os.path.join(content, "index.md"), "# Home")
+
+            watcher = SiteWatcher(content, os.path.join(tmp, "static"), template, docs, "/", generate_page, minify=True)
+            write(os.path.join(content, "index.md"), "# Home\n\nSome   spaced\ntext")
+            self.assertTrue(watcher.poll())
+            self.assertEqual(
+                read(os.path.join(docs, "index.html")),
+                '<main><div><h1 id="home">Home</h1><p>Some spaced text</p></div></main>',
+            )
+
+            write(template, "<article>\n  {{ Content }}\n</article>")
+            self.assertTrue(watcher.poll())
+            self.assertTrue(read(os.path.join(docs, "index.html")).startswith("<article><div>"))
+
+    def test_partial_change_rebuilds_dependent_pages(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            content = os.path.join(tmp, "content")
+            docs = os.path.join(tmp, "docs")
+            template = os.path.join(tmp, "template.html")
+            write(template, "<main>{{ Content }}</main>")
+            write(os.path.join(tmp, "partials", "footer.html"), "<footer>v1</footer>")
+            write(os.path.join(content, "index.md"), "# Home")
+            write(os.path.join(content, "blog", "index.md"), "# Blog")
+
+            watcher = SiteWatcher(content, os.path.join(tmp, "static"), template, docs, "/", generate_page)
+            write(os.path.join(tmp, "layouts", "blog.html"), "<article>{{ Content }}</article>{{> footer }}")
+            self.assertTrue(watcher.poll())
+            self.assertEqual(
+                read(os.path.join(docs, "blog", "index.html")),
+                '<article><div><h1 id="blog">Blog</h1></div></article><footer>v1</footer>',
+            )
+            self.assertFalse(os.path.exists(os.path.join(docs, "index.html")))
+
+            write(os.path.join(tmp, "partials", "footer.html"), "<footer>v2</footer>")
+            self.assertTrue(watcher.poll())
+            self.assertTrue(read(os.path.join(docs, "blog", "index.html")).endswith("<footer>v2</footer>"))
+            self.assertFalse(os.path.exists(os.path.join(docs, "index.html")))
+
+    def test_vanished_asset_is_logged(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            content = os.path.join(tmp, "content")
+            static = os.path.join(tmp, "static")
+            template = os.path.join(tmp, "template.html")
+            write(template, "<main>{{ Content }}</main>")
+            write(os.path.join(content, "index.md"), "# Home")
+
+            watcher = SiteWatcher(content, static, template, os.path.join(tmp, "docs"), "/", generate_page)
+            with self.assertLogs("ssg", level="ERROR") as logs:
+                watcher.apply([os.path.join(static, "gone.css")], [])
+            self.assertIn("Error copying asset", logs.output[0])
+
+if __name__ == "__main__":
+    unittest.main()
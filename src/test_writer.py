@@ -0,0 +1,42 @@
+import os
+import tempfile
+import unittest
+
+from writer import OutputWriter, write_output
+
+
+class TestWriter(unittest.TestCase):
+    def test_write_output_skips_identical_bytes(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "blog", "index.html")
+
+            self.assertTrue(write_output(path, b"<p>one</p>"))
+            os.utime(path, ns=(0, 0))
+            self.assertFalse(write_output(path, b"<p>one</p>"))
+            self.assertEqual(os.stat(path).st_mtime_ns, 0)
+
+            self.assertTrue(write_output(path, b"<p>two</p>"))
+            with open(path, "rb") as f:
+                self.assertEqual(f.read(), b"<p>two</p>")
+            self.assertEqual(os.listdir(os.path.dirname(path)), ["index.html"])
+
+    def test_output_writer(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            write_output(os.path.join(tmp, "same.html"), b"same")
+            os.makedirs(os.path.join(tmp, "taken.html"))
+
+            with OutputWriter(workers=2, max_pending=2) as writer:
+                for i in range(10):
+                    writer.submit(os.path.join(tmp, f"section{i % 3}", f"page{i}.html"), f"<p>{i}</p>".encode())
+                writer.submit(os.path.join(tmp, "same.html"), b"same")
+                writer.submit(os.path.join(tmp, "taken.html"), b"oops")
+
+            self.assertEqual((writer.written, writer.unchanged), (10, 1))
+            self.assertEqual([path for path, _ in writer.errors], [os.path.join(tmp, "taken.html")])
+            with open(os.path.join(tmp, "section1", "page7.html"), "rb") as f:
+                self.assertEqual(f.read(), b"<p>7</p>")
+            self.assertEqual(sorted(os.listdir(tmp)), ["same.html", "section0", "section1", "section2", "taken.html"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,18 +1,57 @@
 import re
 
 from enum import Enum
+from collections import Counter, OrderedDict
 
 from htmlnode import HTMLNode, LeafNode, ParentNode
 
+# bump whenever the HTML or metadata produced for the same markdown changes
+PARSER_VERSION = "6"
+
 IMAGE_REGEX_PATTERN = r"\!\[(.*?)\]\((.*?)\)"
 LINK_REGEX_PATTERN = r"\[(.*?)\]\((.*?)\)"
 
+# emphasis and code are split before images and links, so neither may span a
+# * or `; images are found before links, so a link never spans a whole image
+INLINE_IMAGE_PATTERN = r"\!\[[^*`\n]*?\]\([^*`\n]*?\)"
+INLINE_LINK_CHAR_PATTERN = rf"(?:(?!{INLINE_IMAGE_PATTERN})[^*`\n])"
+
+# every inline construct text_to_textnodes understands, tried in precedence order
+INLINE_PATTERN = re.compile(
+    r"\*\*(?P<bold>(?s:.*?))\*\*"
+    r"|\*(?P<italic>(?s:.+?))\*"
+    r"|`(?P<code>(?s:.*?))`"
+    r"|\!\[(?P<image>[^*`\n]*?)\]\((?P<image_url>[^*`\n]*?)\)"
+    rf"|\[(?P<link>{INLINE_LINK_CHAR_PATTERN}*?)\]\((?P<link_url>{INLINE_LINK_CHAR_PATTERN}*?)\)"
+    r"|_(?P<underscore>(?s:.*?))_"
+)
+INLINE_DELIMITER_PATTERN = re.compile(r"[*`_]")
+
 REGEX_HEADING_PATTERN = r"^(#{1,6}\ )(.*)"
 REGEX_CODE_PATTERN = r"(```)?(\w*)([\S\s]*)(```)"
 REGEX_QUOTE_PATTERN = r">\ ?(.*)"
 REGEX_UNORDERED_LIST_PATTERN = r"^(\* |\- )(.*)"
 REGEX_ORDERED_LIST_PATTERN = r"^([1-9]([0-9]+)?\.\ \w)"
 
+HEADING_PATTERN = re.compile(REGEX_HEADING_PATTERN)
+CODE_PATTERN = re.compile(REGEX_CODE_PATTERN)
+QUOTE_PATTERN = re.compile(REGEX_QUOTE_PATTERN)
+ORDERED_LIST_PATTERN = re.compile(REGEX_ORDERED_LIST_PATTERN)
+
+SLUG_STRIP_PATTERN = re.compile(r"[^\w\s-]")
+SLUG_SPACE_PATTERN = re.compile(r"[\s_-]+")
+# search terms are lowercased words of two or more characters
+TERM_PATTERN = re.compile(r"\w\w+")
+SNIPPET_LENGTH = 160
+# text is tokenized in batches of this many characters rather than node by node
+TERM_BATCH_SIZE = 64 * 1024
+
+# off by default: on typical sites spans rarely repeat and the lookups cost
+# more than they save; sites with shared navigation can turn it on
+DEFAULT_INLINE_MEMO_SIZE = 0
+# longer spans are almost never repeated, memoizing them would only evict short ones
+INLINE_MEMO_MAX_SPAN = 1024
+
 
 class TextType(Enum):
     TEXT = "text"
@@ -33,6 +72,8 @@ class BlockType(Enum):
 
 
 class TextNode:
+    __slots__ = ("text", "text_type", "url")
+
     def __init__(self, text: str, text_type: TextType, url=None):
         self.text = text
         self.text_type = text_type
@@ -49,7 +90,182 @@ class TextNode:
         return f"TextNode({self.text}, {self.text_type.value}, {self.url})"
 
 
-def text_node_to_html_node(text_node: TextNode) -> HTMLNode:
+class Document:
+    # a parsed page plus the metadata gathered while converting it, so later
+    # steps never have to scan the markdown or the HTML again
+    def __init__(self, keep_blocks: bool = True):
+        self.blocks = [] if keep_blocks else None
+        self.node = None
+        self.title = None
+        # (level, plain text, id) per heading
+        self.outline = []
+        self.heading_ids = set()
+        self.slug_counts = {}
+        self.word_count = 0
+        # search term -> occurrences, and the start of the first paragraphs
+        self.terms = Counter()
+        self.term_text = []
+        self.term_text_size = 0
+        self.snippet = ""
+        self.in_paragraph = False
+        self.first_image = None
+        self.links = []
+        self.images = []
+
+    def add_block(self, block: str, block_type: BlockType):
+        if self.blocks is not None:
+            self.blocks.append((block, block_type))
+        self.in_paragraph = block_type == BlockType.PARAGRAPH
+        if self.in_paragraph and 0 < len(self.snippet) < SNIPPET_LENGTH:
+            self.snippet += " "
+        if self.title is None and block.startswith("# "):
+            self.title = block.split("# ", 1)[1].strip()
+
+    def add_heading(self, level: int, text: str) -> str:
+        # returns the heading's id, unique within the document
+        slug = slugify(text)
+        count = self.slug_counts.get(slug, 0)
+        heading_id = f"{slug}-{count}" if count else slug
+        while heading_id in self.heading_ids:
+            count += 1
+            heading_id = f"{slug}-{count}"
+        self.slug_counts[slug] = count + 1
+        self.heading_ids.add(heading_id)
+
+        self.outline.append((level, text, heading_id))
+        return heading_id
+
+    def add_textnodes(self, nodes: list[TextNode]):
+        for node in nodes:
+            match node.text_type:
+                case TextType.IMAGE:
+                    self.images.append(node.url)
+                    if self.first_image is None:
+                        self.first_image = (node.text, node.url)
+                    continue
+                case TextType.LINK:
+                    self.links.append(node.url)
+            self.word_count += len(node.text.split())
+            self.term_text.append(node.text)
+            self.term_text_size += len(node.text)
+            if self.in_paragraph and len(self.snippet) < SNIPPET_LENGTH:
+                self.snippet += node.text
+
+        if self.term_text_size > TERM_BATCH_SIZE:
+            self.count_terms()
+
+    def count_terms(self) -> dict:
+        if self.term_text:
+            self.terms.update(TERM_PATTERN.findall(" ".join(self.term_text).lower()))
+            self.term_text = []
+            self.term_text_size = 0
+
+        return dict(self.terms)
+
+    def snippet_text(self) -> str:
+        # whitespace collapsed and cut at a word boundary
+        text = " ".join(self.snippet.split())
+        if len(text) <= SNIPPET_LENGTH:
+            return text
+
+        return text[:SNIPPET_LENGTH - 3].rsplit(" ", 1)[0] + "..."
+
+    def metadata(self) -> dict:
+        return {
+            "title": self.title,
+            "outline": self.outline,
+            "word_count": self.word_count,
+            "terms": self.count_terms(),
+            "snippet": self.snippet_text(),
+            "first_image": self.first_image,
+            "links": self.links,
+            "images": self.images,
+        }
+
+    @classmethod
+    def from_metadata(cls, metadata: dict):
+        document = cls(keep_blocks=False)
+        document.title = metadata["title"]
+        document.outline = [tuple(entry) for entry in metadata["outline"]]
+        document.word_count = metadata["word_count"]
+        document.terms = Counter(metadata["terms"])
+        document.snippet = metadata["snippet"]
+        document.first_image = tuple(metadata["first_image"]) if metadata["first_image"] else None
+        document.links = list(metadata["links"])
+        document.images = list(metadata["images"])
+        return document
+
+
+class InlineMemo:
+    # bounded LRU of (span, basepath) -> (textnodes, html children) shared by
+    # every page rendered in this process
+    def __init__(self, max_size: int = DEFAULT_INLINE_MEMO_SIZE):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key, entry):
+        self.entries[key] = entry
+        if len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def resize(self, max_size: int):
+        self.max_size = max_size
+        while len(self.entries) > max(max_size, 0):
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+INLINE_MEMO = InlineMemo()
+
+
+def slugify(text: str) -> str:
+    slug = SLUG_SPACE_PATTERN.sub("-", SLUG_STRIP_PATTERN.sub("", text.lower())).strip("-")
+    return slug or "section"
+
+
+def outline_to_html_node(outline, min_level: int = 2):
+    # nested <ul> of links to the document's headings, the h1 title excluded;
+    # None when there is nothing to list
+    entries = [entry for entry in outline if entry[0] >= min_level]
+    if not entries:
+        return None
+
+    node, _ = _toc_list(entries, 0, min(level for level, _, _ in entries))
+    return node
+
+
+def _toc_list(entries: list, start: int, level: int):
+    items = []
+    index = start
+    while index < len(entries) and entries[index][0] >= level:
+        entry_level, text, heading_id = entries[index]
+        children = [LeafNode("a", text, {"href": f"#{heading_id}"})]
+        index += 1
+        if index < len(entries) and entries[index][0] > entry_level:
+            sublist, index = _toc_list(entries, index, entries[index][0])
+            children.append(sublist)
+        items.append(ParentNode("li", children))
+
+    return ParentNode("ul", items), index
+
+
+def text_node_to_html_node(text_node: TextNode, basepath=None) -> HTMLNode:
     match text_node.text_type:
         case TextType.TEXT:
             return LeafNode(None, text_node.text, None)
@@ -60,9 +276,17 @@ def text_node_to_html_node(text_node: TextNode) -> HTMLNode:
         case TextType.CODE:
             return LeafNode("code", text_node.text, None)
         case TextType.LINK:
-            return LeafNode("a", text_node.text, {"href": text_node.url})
+            return LeafNode("a", text_node.text, {"href": with_basepath(text_node.url, basepath)})
         case TextType.IMAGE:
-            return LeafNode("img", "", {"src": text_node.url, "alt": text_node.text})
+            return LeafNode("img", "", {"src": with_basepath(text_node.url, basepath), "alt": text_node.text})
+
+
+def with_basepath(url, basepath):
+    # root-relative urls are served from below the site basepath
+    if basepath and url and url.startswith("/"):
+        return basepath + url[1:]
+
+    return url
 
 
 def split_nodes_delimiter(
@@ -137,116 +361,197 @@ def split_nodes_link(old_nodes: list[TextNode]):
 
 
 def text_to_textnodes(text: str) -> list[TextNode]:
-    nodes = [TextNode(text, TextType.TEXT)]
-
-    nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
-    nodes = split_nodes_delimiter(nodes, "*", TextType.ITALIC)
-    nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
-    nodes = split_nodes_image(nodes)
-    nodes = split_nodes_link(nodes)
-    nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC)
+    # single scan over the span; plain text between matches must not contain
+    # an unmatched delimiter, like the split_nodes_* functions enforce
+    nodes = []
+    position = 0
+    for match in INLINE_PATTERN.finditer(text):
+        start = match.start()
+        if start > position:
+            nodes.append(_plain_text_node(text, position, start))
+        position = match.end()
+
+        match match.lastgroup:
+            case "bold":
+                inner, text_type, url = match.group("bold"), TextType.BOLD, None
+            case "italic":
+                inner, text_type, url = match.group("italic"), TextType.ITALIC, None
+            case "code":
+                inner, text_type, url = match.group("code"), TextType.CODE, None
+            case "image_url":
+                nodes.append(TextNode(match.group("image"), TextType.IMAGE, match.group("image_url")))
+                continue
+            case "link_url":
+                nodes.append(TextNode(match.group("link"), TextType.LINK, match.group("link_url")))
+                continue
+            case _:
+                inner, text_type, url = match.group("underscore"), TextType.ITALIC, None
+
+        if inner == "":
+            continue
+        if "[" in inner and match.lastgroup != "underscore":
+            # images and links inside emphasis or code win over it, as they always have
+            nested = split_nodes_link(split_nodes_image([TextNode(inner, text_type)]))
+            nodes.extend(split_nodes_delimiter(nested, "_", TextType.ITALIC))
+        else:
+            nodes.append(TextNode(inner, text_type, url))
+
+    if position < len(text):
+        nodes.append(_plain_text_node(text, position, len(text)))
+
     return nodes
 
 
+def _plain_text_node(text: str, start: int, end: int) -> TextNode:
+    if INLINE_DELIMITER_PATTERN.search(text, start, end):
+        raise Exception("Invalid Markdown")
+
+    return TextNode(text[start:end], TextType.TEXT)
+
+
 def markdown_to_blocks(markdown: str) -> list[str]:
-    blocks = []
+    return list(iter_blocks(iter_lines(markdown)))
+
+
+def iter_lines(text: str):
+    # lines are sliced lazily from the source instead of splitting it up front
+    start = 0
+    end = text.find("\n")
+    while end != -1:
+        yield text[start:end]
+        start = end + 1
+        end = text.find("\n", start)
+
+    yield text[start:]
+
+
+def iter_file_lines(fp):
+    # newline-stripped lines from an open file, read lazily
+    for line in fp:
+        yield line[:-1] if line.endswith("\n") else line
+
+
+def iter_blocks(lines):
     current_block = []
-    for line in markdown.split("\n"):
-        is_code_block = len(current_block) and current_block[0].startswith("```")
+    is_code_block = False
+    for line in lines:
         if is_code_block:
             current_block.append(line)
             if line == "```":  # closes code tag
-                blocks.append("\n".join(current_block))
-                current_block.clear()
-        else:
-            content = line.strip()
-            if content != "":
-                current_block.append(content)
-                continue
-
-            if len(current_block) != 0:
-                blocks.append("\n".join(current_block))
-                current_block.clear()
+                yield "\n".join(current_block)
+                current_block = []
+                is_code_block = False
+            continue
 
-    if len(current_block) > 0:
-        blocks.append("\n".join(current_block))
-    return blocks
+        content = line.strip()
+        if content != "":
+            if not current_block:
+                is_code_block = content.startswith("```")
+            current_block.append(content)
+            continue
 
+        if current_block:
+            yield "\n".join(current_block)
+            current_block = []
 
-def block_to_block_type(block: str) -> BlockType:
-    if re.match(REGEX_HEADING_PATTERN, block):
-        return BlockType.HEADING
+    if current_block:
+        yield "\n".join(current_block)
 
-    if re.match(REGEX_CODE_PATTERN, block):
-        return BlockType.CODE
 
-    if re.match(REGEX_QUOTE_PATTERN, block):
-        return BlockType.QUOTE
+def iter_typed_blocks(lines):
+    # classifies every block as soon as it is closed
+    for block in iter_blocks(lines):
+        yield block, block_to_block_type(block)
 
-    if re.match(REGEX_UNORDERED_LIST_PATTERN, block):
-        return BlockType.UNORDERED_LIST
 
-    if re.match(REGEX_ORDERED_LIST_PATTERN, block):
-        return BlockType.ORDERED_LIST
+def block_to_block_type(block: str) -> BlockType:
+    # only the entries registered for the block's first character are tried,
+    # so most paragraphs are classified by a single dict lookup
+    for block_type, matches in BLOCK_DISPATCH.get(block[:1], ()):
+        if matches is None or matches(block):
+            return block_type
 
     return BlockType.PARAGRAPH
 
 
-def markdown_to_html_node(markdown):
-    nodes = []
-    mardown_blocks = markdown_to_blocks(markdown)
-    for block in mardown_blocks:
-        block_type = block_to_block_type(block)
-        nodes.append(block_to_html_node(block, block_type))
+def markdown_to_html_node(markdown, basepath=None):
+    # a throwaway document keeps heading ids unique within the page
+    return blocks_to_html_node(iter_typed_blocks(iter_lines(markdown)), basepath, Document(keep_blocks=False))
 
-    return ParentNode("div", nodes)
 
+def markdown_to_document(markdown, basepath=None) -> Document:
+    document = Document()
+    document.node = blocks_to_html_node(iter_typed_blocks(iter_lines(markdown)), basepath, document)
+    return document
 
-def block_to_html_node(block: str, block_type: BlockType) -> HTMLNode:
-    match block_type:
-        case BlockType.HEADING:
-            return heading_block_to_html_node(block)
 
-        case BlockType.CODE:
-            return code_block_to_html_node(block)
+def iter_html_fragments(typed_blocks, basepath=None, document=None, minify=False):
+    # streaming counterpart of blocks_to_html_node: one block in memory at a time
+    yield "<div>"
+    for block, block_type in typed_blocks:
+        if document is not None:
+            document.add_block(block, block_type)
+        yield from block_to_html_node(block, block_type, basepath, document).iter_html(minify)
+    yield "</div>"
 
-        case BlockType.QUOTE:
-            return quote_block_to_html_node(block)
 
-        case BlockType.ORDERED_LIST:
-            return list_block_to_html_node(block)
+def blocks_to_html_node(typed_blocks, basepath=None, document=None):
+    nodes = []
+    for block, block_type in typed_blocks:
+        if document is not None:
+            document.add_block(block, block_type)
+        nodes.append(block_to_html_node(block, block_type, basepath, document))
+
+    return ParentNode("div", nodes)
 
-        case BlockType.UNORDERED_LIST:
-            return list_block_to_html_node(block)
 
-        case BlockType.PARAGRAPH:
-            return paragraph_block_to_html_node(block)
+def block_to_html_node(block: str, block_type: BlockType, basepath=None, document=None) -> HTMLNode:
+    return BLOCK_CONVERTERS[block_type](block, basepath, document)
 
 
 def extract_title(markdown: str) -> str:
-    blocks = markdown_to_blocks(markdown)
-    for block in blocks:
+    for block in iter_blocks(iter_lines(markdown)):
         if block.startswith("# "):
             return block.split("# ", 1)[1].strip()
 
     raise Exception("No title found in markdown")
 
 
+def read_title(typed_blocks) -> tuple[str, list]:
+    # consumes blocks up to the first title and returns them with it, so a
+    # stream can be rendered without a second pass
+    consumed = []
+    for block, block_type in typed_blocks:
+        consumed.append((block, block_type))
+        if block.startswith("# "):
+            return block.split("# ", 1)[1].strip(), consumed
+
+    raise Exception("No title found in markdown")
+
+
 # Helpers
-def heading_block_to_html_node(block: str):
-    h_size = block.count("#")
-    text = block.split("#" * h_size + " ")[1]
-    tag = f"h{h_size}"
+def heading_block_to_html_node(block: str, basepath=None, document=None):
+    prefix = HEADING_PATTERN.match(block).group(1)
+    level = len(prefix) - 1
+    text = block[len(prefix):]
+    tag = f"h{level}"
+
+    nodes, children = inline_nodes(text, basepath)
+    plain_text = "".join(node.text for node in nodes)
+    if document is not None:
+        document.add_textnodes(nodes)
+        props = {"id": document.add_heading(level, plain_text)}
+    else:
+        props = {"id": slugify(plain_text)}
 
-    children = text_to_children(text)
     if children:
-        return ParentNode(tag, children)
+        return ParentNode(tag, children, props)
 
-    return LeafNode(tag, text)
+    return LeafNode(tag, text, props)
 
 
-def code_block_to_html_node(block: str):
-    matches = re.findall(REGEX_CODE_PATTERN, block)[0]
+def code_block_to_html_node(block: str, basepath=None, document=None):
+    matches = CODE_PATTERN.findall(block)[0]
     lang = matches[1]
     code = matches[2].lstrip("\n")
 
@@ -255,28 +560,28 @@ def code_block_to_html_node(block: str):
     return ParentNode("pre", [LeafNode("code", code, props)])
 
 
-def quote_block_to_html_node(block: str):
+def quote_block_to_html_node(block: str, basepath=None, document=None):
     nodes = []
 
-    quotes = re.findall(REGEX_QUOTE_PATTERN, block)
+    quotes = QUOTE_PATTERN.findall(block)
     if len(quotes) == 1:
-        children = text_to_children(quotes[0])
+        children = text_to_children(quotes[0], basepath, document)
         return ParentNode("blockquote", children) if children else LeafNode("blockquote", quotes[0])
 
     for quote in quotes:
-        children = text_to_children(quote)
+        children = text_to_children(quote, basepath, document)
         nodes.append(ParentNode("p", children) if children else LeafNode("p", quote))
 
     return ParentNode("blockquote", nodes)
 
 
-def list_block_to_html_node(block: str):
+def list_block_to_html_node(block: str, basepath=None, document=None):
     nodes = []
 
     lines = block.split("\n")
     for line in lines:
         content = line.split(" ", 1)[1].strip()
-        children = text_to_children(content)
+        children = text_to_children(content, basepath, document)
         nodes.append(
             ParentNode("li", children) if children else LeafNode("li", content)
         )
@@ -285,19 +590,63 @@ def list_block_to_html_node(block: str):
     return ParentNode(tag, nodes)
 
 
-def paragraph_block_to_html_node(block: str):
+def paragraph_block_to_html_node(block: str, basepath=None, document=None):
     tag = "p"
 
-    children = text_to_children(block)
+    children = text_to_children(block, basepath, document)
     if children:
         return ParentNode(tag, children)
 
     return LeafNode(tag, block)
 
 
-def text_to_children(text: str):
-    nodes = text_to_textnodes(text)
+def text_to_children(text: str, basepath=None, document=None):
+    nodes, children = inline_nodes(text, basepath)
+    if document is not None:
+        document.add_textnodes(nodes)
+
+    return children
+
+
+def inline_nodes(text: str, basepath=None) -> tuple:
+    # (textnodes, html children or None for plain text), memoized; the memo
+    # keeps its own leaves and every caller gets fresh copies, so changing a
+    # returned tree never leaks into another page; the textnodes are shared
+    # and must only be read
+    memoize = INLINE_MEMO.max_size > 0 and len(text) <= INLINE_MEMO_MAX_SPAN
+    entry = INLINE_MEMO.get((text, basepath)) if memoize else None
+    if entry is not None:
+        nodes, children = entry
+        return nodes, [child.copy() for child in children] if children is not None else None
+
+    nodes = tuple(text_to_textnodes(text))
     if len(nodes) == 1 and nodes[0].text_type == TextType.TEXT:  # meaning that is leaf
-        return None
+        children = None
+    else:
+        children = [text_node_to_html_node(node, basepath) for node in nodes]
+    if memoize:
+        kept = tuple(child.copy() for child in children) if children is not None else None
+        INLINE_MEMO.put((text, basepath), (nodes, kept))
+
+    return nodes, children
+
+
+# first character -> [(block type, matches)] in the order they were registered;
+# `matches` is None when the first character alone decides the type
+BLOCK_DISPATCH = {}
+# block type -> converter(block, basepath, document) returning its HTMLNode
+BLOCK_CONVERTERS = {BlockType.PARAGRAPH: paragraph_block_to_html_node}
+
+
+def register_block_type(block_type, first_chars: str, converter, matches=None):
+    # new block types can be any hashable value, e.g. a string or another Enum
+    for char in first_chars:
+        BLOCK_DISPATCH.setdefault(char, []).append((block_type, matches))
+    BLOCK_CONVERTERS[block_type] = converter
+
 
-    return list(map(text_node_to_html_node, nodes))
+register_block_type(BlockType.HEADING, "#", heading_block_to_html_node, HEADING_PATTERN.match)
+register_block_type(BlockType.CODE, "`", code_block_to_html_node, lambda block: block.startswith("```"))
+register_block_type(BlockType.QUOTE, ">", quote_block_to_html_node)
+register_block_type(BlockType.UNORDERED_LIST, "*-", list_block_to_html_node, lambda block: block[1:2] == " ")
+register_block_type(BlockType.ORDERED_LIST, "123456789", list_block_to_html_node, ORDERED_LIST_PATTERN.match)
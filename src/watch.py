@@ -0,0 +1,295 @@
+import os
+import time
+import logging
+import pathlib
+import itertools
+import threading
+import functools
+
+from stat import S_ISDIR
+from collections import OrderedDict
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+from assets import copy_asset
+from discovery import ASSET_IGNORE, PAGE_IGNORE, ignore_pattern
+from manifest import RACY_MTIME_NS, remove_output
+from depgraph import DependencyGraph
+from template import TemplateSet
+
+log = logging.getLogger("ssg")
+
+
+# files stat'ed per poll on top of the directories and recently changed files;
+# an in-place edit of a file nobody touched lately is seen within
+# len(files) / SWEEP_BATCH polls, anything else on the next one
+SWEEP_BATCH = 2000
+HOT_FILES = 256
+
+
+class ChangeTracker:
+    # finds changed files without re-scanning the trees on every poll: directory
+    # mtimes reveal added, removed and renamed entries, and only the directories
+    # that moved are listed again; files are stat'ed when they changed recently,
+    # and the rest in rotating batches since writing a file in place leaves its
+    # directory's mtime alone
+    def __init__(self, roots):
+        # roots are (path, ignore globs); a path may be a directory or a single file
+        self.roots = [(str(path), ignore_pattern(ignore)) for path, ignore in roots]
+        self.files = {}
+        self.dirs = {}
+        self.hot = OrderedDict()
+        self.sweep = []
+        self.cursor = 0
+        for root, pattern in self.roots:
+            self._add(root, pattern, [])
+
+        # what was edited last is what is most likely edited next
+        for path in sorted(self.files, key=lambda path: self.files[path][0])[-HOT_FILES:]:
+            self.hot[path] = None
+
+    def _add(self, path, pattern, found: list):
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return
+
+        if not S_ISDIR(stat.st_mode):
+            self.files[path] = (stat.st_mtime_ns, stat.st_size)
+            found.append(path)
+            return
+
+        names = set()
+        self.dirs[path] = (stat.st_mtime_ns, pattern, names)
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    if pattern is not None and pattern.match(entry.name):
+                        continue
+                    if entry.is_dir() or entry.is_file():
+                        names.add(entry.name)
+                        self._add(entry.path, pattern, found)
+        except FileNotFoundError:
+            pass
+
+    def _drop(self, path, removed: list):
+        if path in self.files:
+            del self.files[path]
+            self.hot.pop(path, None)
+            removed.append(path)
+            return
+
+        entry = self.dirs.pop(path, None)
+        if entry is not None:
+            for name in entry[2]:
+                self._drop(os.path.join(path, name), removed)
+
+    def _check(self, path, changed: list, removed: list):
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            directory = os.path.dirname(path)
+            if directory in self.dirs:
+                self.dirs[directory][2].discard(os.path.basename(path))
+            self._drop(path, removed)
+            return
+
+        state = (stat.st_mtime_ns, stat.st_size)
+        if self.files.get(path) != state:
+            self.files[path] = state
+            changed.append(path)
+
+    def _rescan(self, directory, changed: list, removed: list):
+        _, pattern, names = self.dirs[directory]
+        try:
+            stat = os.stat(directory)
+            with os.scandir(directory) as entries:
+                current = {
+                    entry.name: entry.is_dir()
+                    for entry in entries
+                    if (pattern is None or not pattern.match(entry.name)) and (entry.is_dir() or entry.is_file())
+                }
+        except FileNotFoundError:
+            self._drop(directory, removed)
+            return
+
+        self.dirs[directory] = (stat.st_mtime_ns, pattern, set(current))
+        for name in names - set(current):
+            self._drop(os.path.join(directory, name), removed)
+        for name, is_dir in current.items():
+            path = os.path.join(directory, name)
+            if name in names and is_dir != (path in self.dirs):
+                # a file replaced by a directory of the same name, or the other way round
+                self._drop(path, removed)
+                self._add(path, pattern, changed)
+            elif name not in names:
+                self._add(path, pattern, changed)
+            elif not is_dir:
+                # replaced by a rename, as many editors save
+                self._check(path, changed, removed)
+
+    def poll(self) -> tuple[list, list]:
+        # (changed or added, removed) file paths since the last poll
+        changed = []
+        removed = []
+        now = time.time_ns()
+        for directory in list(self.dirs):
+            if directory not in self.dirs:
+                continue
+            mtime_ns = self.dirs[directory][0]
+            try:
+                # a directory changed twice within one mtime tick looks unchanged,
+                # so recently changed ones are listed again until they settle
+                moved = os.stat(directory).st_mtime_ns != mtime_ns or now - mtime_ns < RACY_MTIME_NS
+            except FileNotFoundError:
+                moved = True
+            if moved:
+                self._rescan(directory, changed, removed)
+
+        for root, pattern in self.roots:
+            if root in self.files:
+                self._check(root, changed, removed)
+            elif root not in self.dirs:
+                # not created yet, e.g. a layouts/ directory
+                self._add(root, pattern, changed)
+
+        if self.cursor >= len(self.sweep):
+            self.sweep = list(self.files)
+            self.cursor = 0
+        batch = self.sweep[self.cursor : self.cursor + SWEEP_BATCH]
+        self.cursor += SWEEP_BATCH
+
+        seen = set(changed)
+        for path in itertools.chain(list(self.hot), batch):
+            if path in self.files and path not in seen:
+                seen.add(path)
+                self._check(path, changed, removed)
+
+        for path in changed:
+            self.hot[path] = None
+            self.hot.move_to_end(path)
+        while len(self.hot) > HOT_FILES:
+            self.hot.popitem(last=False)
+
+        return changed, removed
+
+
+def serve(directory, port: int):
+    handler = functools.partial(SimpleHTTPRequestHandler, directory=directory)
+    server = ThreadingHTTPServer(("", port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    return server
+
+
+class SiteWatcher:
+    def __init__(
+        self, content_path, static_path, template_path, build_path, basepath, generate_page, ignore=(), minify=False
+    ):
+        self.content_path = content_path
+        self.static_path = static_path
+        self.template_path = template_path
+        self.build_path = build_path
+        self.basepath = basepath
+        self.generate_page = generate_page
+        self.ignore = tuple(ignore)
+        self.minify = minify
+
+        self.templates = TemplateSet(template_path, basepath, minify)
+        # the same ignore rules as a full build, so drafts never trigger a rebuild
+        asset_ignore = ASSET_IGNORE + self.ignore
+        self.tracker = ChangeTracker(
+            [
+                (content_path, PAGE_IGNORE + self.ignore),
+                (static_path, asset_ignore),
+                (template_path, asset_ignore),
+                (self.templates.layouts_path, asset_ignore),
+                (self.templates.partials_path, asset_ignore),
+            ]
+        )
+        self.graph = DependencyGraph()
+        for source in self.pages():
+            self.graph.add_page(source, self.template_for(source).dependencies)
+
+    def template_for(self, source):
+        return self.templates.for_page(os.path.relpath(source, self.content_path))
+
+    def page_output(self, source) -> pathlib.Path:
+        relpath = os.path.relpath(source, self.content_path)
+        return pathlib.Path(os.path.join(self.build_path, relpath)).with_suffix(".html")
+
+    def pages(self) -> list[str]:
+        return sorted(path for path in self.tracker.files if self._is_page(path))
+
+    def _is_page(self, path) -> bool:
+        return path.startswith(str(self.content_path)) and path.endswith(".md")
+
+    def _is_asset(self, path) -> bool:
+        return path.startswith(str(self.static_path))
+
+    def _is_include(self, path) -> bool:
+        return path == str(self.template_path) or path.startswith(
+            (self.templates.layouts_path, self.templates.partials_path)
+        )
+
+    def poll(self) -> bool:
+        start = time.perf_counter()
+        changed, removed = self.tracker.poll()
+        if not changed and not removed:
+            return False
+
+        self.apply(changed, removed, start)
+        return True
+
+    def apply(self, changed: list, removed: list, start=None):
+        if start is None:
+            start = time.perf_counter()
+
+        pages = [path for path in changed if self._is_page(path)]
+        includes = [path for path in changed + removed if self._is_include(path)]
+        if includes:
+            # recompile and re-render only the pages whose layout or partials
+            # changed, or that switch to a layout that was added or removed
+            self.templates = TemplateSet(self.template_path, self.basepath, self.minify)
+            affected = self.graph.dependents(includes)
+            for source in self.pages():
+                try:
+                    dependencies = self.template_for(source).dependencies
+                except Exception as e:
+                    log.error("Error compiling template for %s: %s: %s", source, type(e).__name__, e)
+                    continue
+                if source in affected or dependencies != self.graph.includes(source):
+                    pages.append(source)
+            pages = sorted(set(pages))
+
+        for source in pages:
+            dest = self.page_output(source)
+            try:
+                template = self.template_for(source)
+                log.info("Generating page from %s to %s using %s", source, dest, template.path)
+                self.generate_page(source, template, dest, self.basepath)
+            except Exception as e:
+                log.error("Error generating page from %s: %s: %s", source, type(e).__name__, e)
+                continue
+            self.graph.add_page(source, template.dependencies)
+
+        for path in changed:
+            if self._is_asset(path):
+                try:
+                    copy_asset(path, os.path.join(self.build_path, os.path.relpath(path, self.static_path)))
+                except OSError as e:
+                    # removed or unreadable again before it could be copied
+                    log.error("Error copying asset %s: %s: %s", path, type(e).__name__, e)
+
+        for path in removed:
+            if self._is_page(path):
+                self.graph.remove_page(path)
+                remove_output(self.page_output(path), self.build_path)
+            elif self._is_asset(path):
+                remove_output(os.path.join(self.build_path, os.path.relpath(path, self.static_path)), self.build_path)
+
+        log.info("Rebuilt %d page(s) in %.1fms", len(pages), (time.perf_counter() - start) * 1000)
+
+    def run(self, interval: float):
+        while True:
+            time.sleep(interval)
+            self.poll()
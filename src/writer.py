@@ -0,0 +1,86 @@
+import os
+import threading
+
+from concurrent.futures import ThreadPoolExecutor
+
+
+def write_output(path, data: bytes, directories=None) -> bool:
+    # atomically replaces `path` with `data`; returns False without touching the
+    # file when it already holds exactly these bytes, so its mtime is kept
+    try:
+        if os.path.getsize(path) == len(data):
+            with open(path, "rb") as f:
+                if f.read() == data:
+                    return False
+    except FileNotFoundError:
+        pass
+
+    directory = os.path.dirname(path)
+    if directories is None or directory not in directories:
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if directories is not None:
+            directories.add(directory)
+
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    return True
+
+
+class OutputWriter:
+    # writes rendered pages on a thread pool so rendering never waits on disk;
+    # at most `max_pending` pages are buffered before submit blocks
+    def __init__(self, workers: int = 4, max_pending: int = 64):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="writer")
+        self.slots = threading.BoundedSemaphore(max_pending)
+        self.directories = set()
+        self.lock = threading.Lock()
+        self.written = 0
+        self.unchanged = 0
+        self.errors = []
+
+    def submit(self, path, data: bytes):
+        self.slots.acquire()
+        try:
+            future = self.executor.submit(self._write, str(path), data)
+        except BaseException:
+            self.slots.release()
+            raise
+        future.add_done_callback(lambda _: self.slots.release())
+        return future
+
+    def _write(self, path: str, data: bytes):
+        try:
+            changed = write_output(path, data, self.directories)
+        except Exception as e:
+            with self.lock:
+                self.errors.append((path, f"{type(e).__name__}: {e}"))
+            return
+
+        with self.lock:
+            if changed:
+                self.written += 1
+            else:
+                self.unchanged += 1
+
+    def close(self) -> list[tuple[str, str]]:
+        # waits for every queued write and returns the (path, error) pairs that failed
+        self.executor.shutdown(wait=True)
+        return self.errors
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def summary(self) -> str:
+        return f"Wrote {self.written} page(s), {self.unchanged} unchanged"